@@ -0,0 +1,42 @@
+# This is a game called "Color Cube".
+#
+# Color Cube is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Color Cube is distributed in the hope that it will be useful and maybe even fun,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Color Cube.  If not, see <http://www.gnu.org/licenses/>.
+#
+# copyright  2013 onwards Andrew Davis
+# license    http://www.gnu.org/copyleft/gpl.html GNU GPL v3 or later
+
+# Color Cube as a package. Nothing here is imported up front, and importing
+# any module only defines things: no window, sound or fonts are set up until
+# something is drawn or played. So the levels, the simulation and the tools
+# can be used without a display.
+#
+#   colorcube.game       the game, run() plays it
+#   colorcube.world      one level being played, without drawing
+#   colorcube.batch      many worlds stepped at once
+#   colorcube.levels     the level data
+#   colorcube.colors     which colors the player can make on a level, and hints
+#   colorcube.sprites    the sprites and the settings they share
+#   colorcube.spatial    a grid of sprites for finding collisions
+#   colorcube.render     drawing a world, to the screen or to arrays
+#   colorcube.images     sprite images shared between sprites
+#   colorcube.fonts      fonts and rendered text
+#   colorcube.lru        the cache images and text are kept in
+#   colorcube.sounds     sounds and music, loaded in the background
+#   colorcube.profiler   timing each phase of each frame
+#   colorcube.replay     recording and replaying games
+#   colorcube.solver     searching for a way through a level
+#   colorcube.env        the game as an environment for training agents
+#   colorcube.generator  making levels at random
+#   colorcube.tournament scoring players over many levels in many processes
+#   colorcube.benchmark  timing all of the above
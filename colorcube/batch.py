@@ -0,0 +1,373 @@
+# This is a game called "Color Cube".
+#
+# Color Cube is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Color Cube is distributed in the hope that it will be useful and maybe even fun,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Color Cube.  If not, see <http://www.gnu.org/licenses/>.
+#
+# copyright  2013 onwards Andrew Davis
+# license    http://www.gnu.org/copyleft/gpl.html GNU GPL v3 or later
+
+# Many independent worlds stepped together with numpy.
+#
+# Every entity of every world lives in a row of a set of (worlds, entities)
+# arrays. The entity slots are laid out the same way in every world:
+#
+#   0                       the player
+#   1                       the exit
+#   first_block ...         the cubes
+#   first_barrier ...       the barriers
+#   first_platform ...      the platforms
+#
+# Worlds with fewer cubes, barriers or platforms than the largest world have
+# their spare slots marked as not alive. step() gives the same results as
+# World.step(), tick for tick.
+
+import copy
+
+import numpy
+from pygame.locals import *
+
+from colorcube.world import *
+
+NOTHING = -1
+
+# the arrays that have one row per world
+per_world = ('pos', 'pos_previous', 'vel', 'size', 'half', 'color', 'sitting_on',
+    'alive', 'rect_pos', 'level', 'time', 'reached_exit')
+
+class BatchWorld:
+    
+    def __init__(self, worlds):
+        # worlds is a list of World instances that have had setup_level() called.
+        # They are only read from.
+        if [w for w in worlds if w.fixed_point]:
+            raise ValueError('batches only step float physics, not fixed point worlds')
+        self.count = len(worlds)
+        
+        self.block_count = max(len(w.block_group) for w in worlds)
+        self.barrier_count = max(len(w.barrier_group) for w in worlds)
+        self.platform_count = max(len(w.platform_group) for w in worlds)
+        
+        self.first_block = 2
+        self.first_barrier = self.first_block + self.block_count
+        self.first_platform = self.first_barrier + self.barrier_count
+        self.entity_count = self.first_platform + self.platform_count
+        
+        shape = (self.count, self.entity_count)
+        self.pos = numpy.zeros(shape + (2,), numpy.int64)
+        self.pos_previous = numpy.zeros(shape + (2,), numpy.int64)
+        self.vel = numpy.zeros(shape + (2,), numpy.float64)
+        self.size = numpy.ones(shape + (2,), numpy.int64)
+        self.color = numpy.zeros(shape + (3,), numpy.int64)
+        self.sitting_on = numpy.zeros(shape, numpy.int64) + NOTHING
+        self.alive = numpy.zeros(shape, bool)
+        # top left of each entity's rect as of its last update, like Sprite.rect
+        self.rect_pos = numpy.zeros(shape + (2,), numpy.int64)
+        
+        self.level = numpy.zeros(self.count, numpy.int64)
+        self.time = numpy.zeros(self.count, numpy.int64)
+        self.reached_exit = numpy.zeros(self.count, bool)
+        
+        for i, w in enumerate(worlds):
+            self._load(i, w)
+        
+        self.half = self.size // 2
+    
+    @classmethod
+    def from_levels(cls, levels):
+        # Set up one world per entry in levels, sharing the work between
+        # worlds that start on the same level.
+        templates = {}
+        for level in set(levels):
+            w = World()
+            w.setup_level(level)
+            templates[level] = w
+        return cls([templates[level] for level in levels])
+    
+    def take(self, rows):
+        # A new BatchWorld of copies of the given worlds. Rows may repeat, which
+        # is how a search branches one world into several.
+        other = copy.copy(self)
+        for name in per_world:
+            setattr(other, name, getattr(self, name)[rows])
+        other.count = len(other.level)
+        return other
+    
+    def _load(self, i, w):
+        slots = {}
+        def put(j, sprite):
+            slots[sprite] = j
+            self.pos[i, j] = sprite.pos
+            self.pos_previous[i, j] = sprite.pos_previous
+            self.vel[i, j] = sprite.vel
+            self.size[i, j] = sprite.size
+            self.color[i, j] = sprite.color
+            self.rect_pos[i, j] = sprite.rect.topleft
+            self.alive[i, j] = True
+        
+        put(0, w.player_block)
+        put(1, w.exit)
+        for j, sprite in enumerate(w.block_group):
+            put(self.first_block + j, sprite)
+        for j, sprite in enumerate(w.barrier_group):
+            put(self.first_barrier + j, sprite)
+        for j, sprite in enumerate(w.platform_group):
+            put(self.first_platform + j, sprite)
+        
+        for sprite, j in slots.items():
+            if sprite.sitting_on:
+                self.sitting_on[i, j] = slots[sprite.sitting_on]
+        
+        self.level[i] = w.level
+        self.time[i] = w.time
+        self.reached_exit[i] = w.reached_exit
+    
+    def _blocks(self):
+        return slice(self.first_block, self.first_barrier)
+    
+    def _barriers(self):
+        return slice(self.first_barrier, self.first_platform)
+    
+    def _platforms(self):
+        return slice(self.first_platform, self.entity_count)
+    
+    def _which(self, which):
+        # which worlds an input applies to: None for all, or a mask or index array
+        mask = ~self.reached_exit & self.alive[:, 0]
+        if which is None:
+            return mask
+        selected = numpy.zeros(self.count, bool)
+        selected[which] = True
+        return mask & selected
+    
+    def key_down(self, k, which=None):
+        m = self._which(which)
+        vel = self.vel[:, 0]
+        if k == K_LEFT:
+            vel[m, 0] -= g.block_move
+        elif k == K_RIGHT:
+            vel[m, 0] += g.block_move
+        elif k == K_SPACE:
+            self.jump(m)
+    
+    def key_up(self, k, which=None):
+        m = self._which(which)
+        vel = self.vel[:, 0]
+        if k == K_LEFT:
+            vel[m, 0] += g.block_move
+            vel[m & (vel[:, 0] > 0), 0] = 0
+        elif k == K_RIGHT:
+            vel[m, 0] -= g.block_move
+            vel[m & (vel[:, 0] < 0), 0] = 0
+    
+    def jump(self, m, j=0):
+        # can only jump when not already in the air
+        m = m & (self.vel[:, j, 1] == 0)
+        self.vel[m, j, 1] = g.block_jump
+        self.sitting_on[m, j] = NOTHING
+    
+    def _update_pos(self, m, e):
+        # the same integer floor as Sprite.update_pos
+        self.pos_previous[:, e][m] = self.pos[:, e][m]
+        moved = numpy.floor(self.pos[:, e] + self.vel[:, e]).astype(numpy.int64)
+        self.pos[:, e][m] = moved[m]
+    
+    def _keep_onscreen(self, m, e, stop):
+        pos = self.pos[:, e]
+        half = self.half[:, e]
+        vel = self.vel[:, e]
+        
+        # only the first edge found is dealt with, as in Sprite.keep_onscreen
+        left = m & (pos[..., 0] - half[..., 0] < 0)
+        right = m & ~left & (pos[..., 0] + half[..., 0] > g.width)
+        top = m & ~left & ~right & (pos[..., 1] - half[..., 1] < 0)
+        bottom = m & ~left & ~right & ~top & (pos[..., 1] + half[..., 1] > g.height)
+        
+        across = left | right
+        revert = across | top | bottom
+        pos[revert] = self.pos_previous[:, e][revert]
+        if stop:
+            vel[across, 0] = 0
+        else:
+            vel[across, 0] = -vel[across, 0]
+        vel[top | bottom, 1] = 0
+        self.pos[:, e] = pos
+        self.vel[:, e] = vel
+    
+    def _sitting_on(self, e):
+        # position and half size of what each entity is sitting on
+        on = self.sitting_on[:, e]
+        index = numpy.maximum(on, 0)
+        rows = numpy.arange(self.count).reshape((-1,) + (1,) * (on.ndim - 1))
+        return on != NOTHING, self.pos[rows, index], self.half[rows, index]
+    
+    def _update_rect(self, m, e):
+        rect_pos = self.pos[:, e] - self.half[:, e]
+        self.rect_pos[:, e][m] = rect_pos[m]
+    
+    def _collide(self, a, b):
+        # does each rect in a overlap each rect in b, broadcast over the entity axes
+        a_pos = self.rect_pos[:, a]
+        b_pos = self.rect_pos[:, b]
+        a_size = self.size[:, a]
+        b_size = self.size[:, b]
+        if a_pos.ndim == 2:
+            a_pos = a_pos[:, None]
+            a_size = a_size[:, None]
+        else:
+            a_pos = a_pos[:, :, None]
+            a_size = a_size[:, :, None]
+            b_pos = b_pos[:, None]
+            b_size = b_size[:, None]
+        hit = ((a_pos < b_pos + b_size) & (b_pos < a_pos + a_size)).all(axis=-1)
+        alive = self.alive[:, b]
+        if hit.ndim == 3:
+            alive = alive[:, None] & self.alive[:, a][:, :, None]
+        return hit & alive
+    
+    def step(self):
+        # Advance every world that has not reached its exit by one tick.
+        # Returns (absorbed, barrier, exit), boolean arrays saying which worlds
+        # had each event this tick.
+        active = ~self.reached_exit
+        self.time[active] += 1
+        
+        blocks = self._blocks()
+        barriers = self._barriers()
+        platforms = self._platforms()
+        block_count = self.block_count
+        
+        # blocks
+        m = active[:, None] & self.alive[:, blocks]
+        self._update_pos(m, blocks)
+        self._keep_onscreen(m, blocks, False)
+        
+        # Blocks shouldn't run off the end of platforms
+        on, on_pos, on_half = self._sitting_on(blocks)
+        pos = self.pos[:, blocks]
+        half = self.half[:, blocks]
+        off = ((pos[..., 0] + half[..., 0] > on_pos[..., 0] + on_half[..., 0])
+            | (pos[..., 0] - half[..., 0] < on_pos[..., 0] - on_half[..., 0]))
+        turn = m & on & off
+        self.vel[:, blocks][turn, 0] *= -1
+        self._update_rect(m, blocks)
+        
+        # Are any blocks on a platform? Like groupcollide the first platform hit counts.
+        hits = self._collide(blocks, platforms) & m[:, :, None]
+        any_hit = hits.any(axis=2)
+        first = hits.argmax(axis=2) + self.first_platform
+        rows = numpy.arange(self.count)[:, None]
+        platform_y = self.pos[rows, first, 1]
+        land = any_hit & (self.sitting_on[:, blocks] != first) & (self.pos[:, blocks, 1] < platform_y)
+        self._on_platform(land, blocks, first)
+        
+        # Have any blocks hit a barrier?
+        hits = self._collide(blocks, barriers) & m[:, :, None]
+        any_hit = hits.any(axis=2)
+        first = hits.argmax(axis=2) + self.first_barrier
+        barrier_color = self.color[rows, first]
+        bounce = any_hit & (self.color[:, blocks] != barrier_color).any(axis=-1)
+        # block cannot pass through
+        vel = self.vel[:, blocks]
+        vel[bounce, 0] *= -1
+        self.vel[:, blocks] = vel
+        edge = self.pos[rows, first, 0] - self.half[rows, first, 0] - self.half[:, blocks, 0]
+        pos = self.pos[:, blocks]
+        pos[bounce, 0] = edge[bounce]
+        self.pos[:, blocks] = pos
+        
+        # the player
+        m = active & self.alive[:, 0]
+        self._update_pos(m, 0)
+        sitting = self.sitting_on[:, 0] != NOTHING
+        self.vel[m & ~sitting, 0, 1] += g.gravity
+        self._keep_onscreen(m, 0, True)
+        
+        on, on_pos, on_half = self._sitting_on(0)
+        pos = self.pos[:, 0]
+        half = self.half[:, 0]
+        offleft = (pos[:, 0] + half[:, 0]) < (on_pos[:, 0] - on_half[:, 0])
+        offright = (pos[:, 0] - half[:, 0]) > (on_pos[:, 0] + on_half[:, 0])
+        over = (pos[:, 1] + half[:, 1]) - (on_pos[:, 1] - on_half[:, 1])
+        moved_off = m & on & (offleft | offright | (over != 0))
+        self.sitting_on[moved_off, 0] = NOTHING
+        self._update_rect(m, 0)
+        
+        # Did the player touch a block?
+        hits = self._collide(0, blocks) & m[:, None]
+        absorbed = hits.any(axis=1)
+        start = numpy.array(g.player_start_color)
+        for j in range(block_count):
+            hit = hits[:, j]
+            if not hit.any():
+                continue
+            block_color = self.color[:, self.first_block + j]
+            player_color = self.color[:, 0]
+            fresh = (player_color == start).all(axis=1)
+            combined = numpy.where(fresh[:, None], block_color, player_color + block_color)
+            self.color[hit, 0] = combined[hit]
+            self.alive[hit, self.first_block + j] = False
+            self.sitting_on[hit, self.first_block + j] = NOTHING
+        
+        # Did the player touch a platform?
+        hits = self._collide(0, platforms) & m[:, None]
+        for j in range(self.platform_count):
+            hit = hits[:, j]
+            if not hit.any():
+                continue
+            p = self.first_platform + j
+            platform_top = self.pos[:, p, 1] - self.half[:, p, 1]
+            was_above = (self.pos_previous[:, 0, 1] + self.half[:, 0, 1]) <= platform_top
+            is_above = (self.pos[:, 0, 1] + self.half[:, 0, 1]) <= platform_top
+            self._on_platform(hit & (was_above | is_above), 0, p)
+        
+        # Did the player touch a barrier?
+        hits = self._collide(0, barriers) & m[:, None]
+        barrier = numpy.zeros(self.count, bool)
+        for j in range(self.barrier_count):
+            b = self.first_barrier + j
+            stop = hits[:, j] & (self.color[:, 0] != self.color[:, b]).any(axis=1)
+            # player cannot pass through
+            self.vel[stop, 0, 0] = 0
+            edge = self.pos[:, b, 0] - self.half[:, b, 0] - self.half[:, 0, 0]
+            self.pos[stop, 0, 0] = edge[stop]
+            barrier |= stop
+        
+        # Has the player reached the exit?
+        exit = self._collide(0, numpy.array([1]))[:, 0] & m
+        self.reached_exit |= exit
+        
+        return absorbed, barrier, exit
+    
+    def _on_platform(self, m, e, platform):
+        # sprite_on_platform for every entity e in m; platform is an index per entity
+        platform = numpy.broadcast_to(platform, m.shape)
+        rows = numpy.arange(self.count).reshape((-1,) + (1,) * (m.ndim - 1))
+        rows = numpy.broadcast_to(rows, m.shape)
+        sitting_on = self.sitting_on[:, e]
+        vel = self.vel[:, e]
+        pos = self.pos[:, e]
+        half = self.half[:, e]
+        top = self.pos[rows, platform, 1] - self.half[rows, platform, 1]
+        sitting_on[m] = platform[m]
+        vel[m, 1] = 0
+        pos[m, 1] = (top - half[..., 1])[m]
+        self.sitting_on[:, e] = sitting_on
+        self.vel[:, e] = vel
+        self.pos[:, e] = pos
+    
+    def run(self, ticks):
+        for i in xrange(ticks):
+            if self.reached_exit.all():
+                return i
+            self.step()
+        return ticks
@@ -0,0 +1,272 @@
+# This is a game called "Color Cube".
+#
+# Color Cube is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Color Cube is distributed in the hope that it will be useful and maybe even fun,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Color Cube.  If not, see <http://www.gnu.org/licenses/>.
+#
+# copyright  2013 onwards Andrew Davis
+# license    http://www.gnu.org/copyleft/gpl.html GNU GPL v3 or later
+
+# Benchmarks for the simulation, collisions, drawing and level loading.
+#
+# Runs without a window using SDL's dummy video driver and writes the results
+# as JSON, so two runs can be compared:
+#
+#   python -m colorcube.benchmark --output before.json
+#   python -m colorcube.benchmark --output after.json --compare before.json
+#
+# Every result is a rate, so bigger is always better.
+#
+# Startup is timed in fresh interpreters: importing the modules tools use, and
+# getting the game to its first frame. Importing must not open a window, and
+# if the first frame takes longer than startup_budget the run fails.
+
+import os, sys, json, time, random, platform, subprocess
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import pygame
+from pygame.locals import *
+
+from colorcube.world import *
+from colorcube.levels import LevelPack
+from colorcube.render import DirtyRenderer, draw_world
+
+timer = time.time
+if sys.platform == 'win32':
+    timer = time.clock
+
+# seconds from starting python to the game's first frame
+startup_budget = 0.5
+
+# run in a fresh interpreter, the last line printed is the seconds taken and
+# whether a window was opened
+import_code = '''
+import time
+start = time.time()
+import %s
+import pygame
+print time.time() - start, pygame.display.get_init()
+'''
+
+first_frame_code = '''
+import time
+start = time.time()
+import pygame
+from colorcube import game
+game.init()
+game.draw_splash(game.screen)
+pygame.display.flip()
+print time.time() - start, pygame.display.get_init()
+'''
+
+def rate(f, min_time=0.5):
+    # How many times a second f() can be called, timing for at least min_time.
+    # f returns how many things it did.
+    count = 0
+    start = timer()
+    while True:
+        count += f()
+        elapsed = timer() - start
+        if elapsed >= min_time:
+            return count / elapsed
+
+def playing_world(level, levels=None, seed=0):
+    # a world with the player wandering about, so the player and cubes move
+    world = World(levels)
+    world.setup_level(level)
+    rnd = random.Random(seed)
+    def step(ticks):
+        for i in range(ticks):
+            if world.time % 20 == 0:
+                k = rnd.choice([K_LEFT, K_RIGHT, K_SPACE, None])
+                for kk in (K_LEFT, K_RIGHT):
+                    if kk != k:
+                        world.key_up(kk)
+                if k:
+                    world.key_down(k)
+            world.step()
+            if world.reached_exit:
+                world.setup_level(level)
+        return ticks
+    return world, step
+
+def scaled_levels(platforms, cubes, seed=0):
+    # A level pack with one level with about this many platforms and cubes.
+    rnd = random.Random(seed)
+    rows = max(1, int(platforms ** 0.5))
+    columns = max(1, platforms / rows)
+    width = g.width / columns
+    gap = g.height / (rows + 1)
+    level = {
+        'exit': {'pos': [765, 563], 'size': [50, 75], 'color': [255, 255, 255]},
+        'player': {'pos': [650, 560]},
+        'barriers': [{'pos': [700, 540], 'size': [5, 120], 'color': [0, 0, 255]}],
+        'platforms': [{'pos': [g.width/2, g.height - 2], 'size': [g.width, 5]}],
+        'cubes': [],
+    }
+    for row in range(rows):
+        for column in range(columns):
+            level['platforms'].append({'pos': [column * width + width/2, (row + 1) * gap], 'size': [width - 10, 5]})
+    colors = [[255, 0, 0], [0, 255, 0], [0, 0, 255]]
+    for i in range(cubes):
+        p = rnd.choice(level['platforms'][1:] or level['platforms'])
+        level['cubes'].append({'pos': [p['pos'][0], p['pos'][1] - 22], 'color': rnd.choice(colors)})
+    return LevelPack({'levels': [level]}, 'scaled %d %d' % (platforms, cubes))
+
+def bench_ticks(results, levels):
+    for level in levels:
+        world, step = playing_world(level)
+        results['ticks_per_second.level_%d' % level] = rate(lambda: step(100))
+
+def bench_scaling(results, sizes):
+    for (platforms, cubes) in sizes:
+        pack = scaled_levels(platforms, cubes)
+        world, step = playing_world(1, pack)
+        results['ticks_per_second.%d_platforms_%d_cubes' % (platforms, cubes)] = rate(lambda: step(20))
+
+def bench_batch(results, counts):
+    from colorcube.batch import BatchWorld
+    for count in counts:
+        batch = BatchWorld.from_levels([1 + i % 8 for i in range(count)])
+        def step():
+            batch.step()
+            return count
+        results['world_ticks_per_second.batch_%d' % count] = rate(step)
+
+def bench_render(results, screen, level):
+    bg = pygame.Surface(screen.get_size()).convert()
+    bg.fill((0,0,0))
+    world, step = playing_world(level)
+    
+    def full():
+        step(1)
+        draw_world(screen, bg, world)
+        pygame.display.flip()
+        return 1
+    results['frames_per_second.full_repaint'] = rate(full)
+    
+    def groups():
+        world.block_group.draw(screen)
+        world.platform_group.draw(screen)
+        return 1
+    results['draws_per_second.block_and_platform_groups'] = rate(groups)
+    
+    def flip():
+        pygame.display.flip()
+        return 1
+    results['flips_per_second'] = rate(flip)
+    
+    renderer = DirtyRenderer(screen)
+    def dirty():
+        step(1)
+        pygame.display.update(renderer.draw(world))
+        return 1
+    results['frames_per_second.dirty_rects'] = rate(dirty)
+
+def startup_time(code):
+    output = subprocess.check_output([sys.executable, '-c', code])
+    (elapsed, display) = output.splitlines()[-1].split()
+    return float(elapsed), display == 'True'
+
+def bench_startup(results, modules, runs=5):
+    for module in modules:
+        times = []
+        for i in range(runs):
+            (elapsed, display) = startup_time(import_code % module)
+            if display:
+                raise AssertionError('importing %s opened a window' % module)
+            times.append(elapsed)
+        results['imports_per_second.%s' % module] = 1 / min(times)
+    times = [startup_time(first_frame_code)[0] for i in range(runs)]
+    results['startups_per_second.first_frame'] = 1 / min(times)
+
+def bench_setup(results, levels):
+    world = World()
+    for level in levels:
+        def setup():
+            world.setup_level(level)
+            return 1
+        results['setups_per_second.level_%d' % level] = rate(setup, 0.2)
+
+def run(quick=False):
+    pygame.init()
+    screen = pygame.display.set_mode((g.width, g.height))
+    levels = range(1, len(load_levels()) + 1)
+    
+    results = {}
+    bench_startup(results, ['colorcube.levels', 'colorcube.world', 'colorcube.game'])
+    bench_ticks(results, levels)
+    bench_setup(results, levels)
+    bench_render(results, screen, 1)
+    if quick:
+        bench_scaling(results, [(50, 10)])
+        bench_batch(results, [1000])
+    else:
+        bench_scaling(results, [(10, 3), (50, 10), (200, 30), (800, 60)])
+        bench_batch(results, [100, 1000, 10000])
+    
+    return {
+        'time': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'python': platform.python_version(),
+        'pygame': pygame.version.ver,
+        'machine': platform.machine(),
+        'results': results,
+    }
+
+def compare(new, old):
+    # new / old for every result in both, so above 1 is faster
+    ratios = {}
+    for name, value in new['results'].items():
+        if old['results'].get(name):
+            ratios[name] = value / old['results'][name]
+    return ratios
+
+def main(argv):
+    from optparse import OptionParser
+    parser = OptionParser()
+    parser.add_option('--output', metavar='FILE', help='write the results to FILE as JSON')
+    parser.add_option('--compare', metavar='FILE', help='compare with the results in FILE')
+    parser.add_option('--quick', action='store_true', help='skip the slowest benchmarks')
+    (options, args) = parser.parse_args(argv[1:])
+    
+    report = run(options.quick)
+    
+    if options.compare:
+        f = open(options.compare)
+        try:
+            report['compared_with'] = options.compare
+            report['ratios'] = compare(report, json.load(f))
+        finally:
+            f.close()
+    
+    for name in sorted(report['results']):
+        line = '%-50s %14.1f' % (name, report['results'][name])
+        if name in report.get('ratios', {}):
+            line += '  x%.2f' % report['ratios'][name]
+        print line
+    
+    first_frame = 1 / report['results']['startups_per_second.first_frame']
+    if first_frame > startup_budget:
+        print 'first frame after %.0f ms, over the %.0f ms budget' % (first_frame * 1000, startup_budget * 1000)
+    
+    if options.output:
+        f = open(options.output, 'w')
+        try:
+            json.dump(report, f, indent=2, sort_keys=True)
+        finally:
+            f.close()
+    return first_frame > startup_budget and 1 or 0
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
@@ -0,0 +1,205 @@
+# This is a game called "Color Cube".
+#
+# Color Cube is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Color Cube is distributed in the hope that it will be useful and maybe even fun,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Color Cube.  If not, see <http://www.gnu.org/licenses/>.
+#
+# copyright  2013 onwards Andrew Davis
+# license    http://www.gnu.org/copyleft/gpl.html GNU GPL v3 or later
+
+# Which colors the player can make on a level.
+#
+# The player's color is the sum of the cubes it has absorbed, so it only
+# depends on how many cubes of each color have been absorbed, not which or in
+# what order. A ColorTable has a state for every such set of counts, with the
+# color it makes and which of the exit's barriers can still be got through
+# from it by absorbing more. The exit's barriers are the ones standing
+# between where the player starts and the exit, which the player has to be
+# their color to cross.
+#
+# CompiledLevel.color_table() makes the table once per level. The solver uses
+# it to drop states that can't reach the exit any more, and hint() to tell the
+# player which cubes to go for and which to keep away from.
+
+from colorcube.sprites import g, color_combine
+
+# Colors made of 0 and 255 only, by red, green and blue as bits 1, 2 and 4.
+COLOR_NAMES = {0: 'black', 1: 'red', 2: 'green', 3: 'yellow', 4: 'blue', 5: 'magenta', 6: 'cyan', 7: 'white'}
+
+def mask_color(mask):
+    return [255 * (mask & 1), 255 * ((mask >> 1) & 1), 255 * ((mask >> 2) & 1)]
+
+def color_name(color):
+    if [c for c in color if c not in (0, 255)]:
+        return 'rgb(%d, %d, %d)' % tuple(color)
+    return COLOR_NAMES[(color[0] and 1) | (color[1] and 2) | (color[2] and 4)]
+
+def exit_barriers(level):
+    # The numbers of the barriers in level between the player's start and the exit.
+    start = level.player_pos[0]
+    exit = level.exit.rect
+    found = []
+    for (i, barrier) in enumerate(level.barriers):
+        x = barrier.pos[0]
+        between = min(start, exit.centerx) < x < max(start, exit.centerx)
+        if between and barrier.rect.top < exit.bottom and barrier.rect.bottom > exit.top:
+            found.append(i)
+    return found
+
+class ColorTable:
+    
+    def __init__(self, level):
+        # the colors of the level's cubes, how many there are of each, and which
+        # of them each cube is
+        self.colors = []
+        self.counts = []
+        self.cube_kinds = []
+        for (pos, vel, color, size) in level.cubes:
+            if color not in self.colors:
+                self.colors.append(color)
+                self.counts.append(0)
+            kind = self.colors.index(color)
+            self.counts[kind] += 1
+            self.cube_kinds.append(kind)
+        
+        # a state is a number, kind k's count times strides[k] summed
+        self.strides = []
+        states = 1
+        for count in self.counts:
+            self.strides.append(states)
+            states *= count + 1
+        self.states = states
+        
+        self.barriers = exit_barriers(level)
+        self.barrier_colors = dict((b, level.barriers[b].color) for b in self.barriers)
+        self.barrier_x = dict((b, level.barriers[b].pos[0]) for b in self.barriers)
+        self.barrier_sides = dict((b, cmp(self.barrier_x[b], level.player_pos[0])) for b in self.barriers)
+        
+        self.color = []
+        for state in range(states):
+            counts = self.state_counts(state)
+            color = level.player_color
+            if sum(counts) and color == g.player_start_color:
+                # the first cube absorbed replaces the start color
+                color = (0, 0, 0)
+            for kind, count in enumerate(counts):
+                for i in range(count):
+                    color = color_combine(color, self.colors[kind])
+            self.color.append(color)
+        
+        # The barriers that can still be got through from each state, by
+        # absorbing nothing or more. States with more absorbed have higher
+        # numbers, so going backwards they are always done first.
+        self.can_open = [None] * states
+        for state in range(states - 1, -1, -1):
+            can_open = set(b for b in self.barriers if self.color[state] == self.barrier_colors[b])
+            for kind in self.next_kinds(state):
+                can_open |= self.can_open[state + self.strides[kind]]
+            self.can_open[state] = frozenset(can_open)
+    
+    def state_counts(self, state):
+        return [state // stride % (count + 1) for (stride, count) in zip(self.strides, self.counts)]
+    
+    def next_kinds(self, state):
+        # the kinds of cube that are left to absorb
+        return [kind for (kind, count) in enumerate(self.state_counts(state)) if count < self.counts[kind]]
+    
+    def state(self, absorbed):
+        # The state after absorbing the cubes numbered in absorbed.
+        return sum(self.strides[self.cube_kinds[i]] for i in absorbed)
+    
+    def solvable(self):
+        # whether every barrier in front of the exit can be got through from the start
+        return len(self.can_open[0]) == len(self.barriers)
+    
+    def reachable_colors(self):
+        return set(self.color)
+    
+    def ways(self, barrier):
+        # Every set of counts that makes barrier's color, as a list of
+        # [(color, count)] of the cubes to absorb.
+        ways = []
+        for state in range(self.states):
+            if self.color[state] == self.barrier_colors[barrier]:
+                counts = self.state_counts(state)
+                ways.append([(self.colors[k], n) for (k, n) in enumerate(counts) if n])
+        return ways
+    
+    def traps(self, state, barriers=None):
+        # The colors of cube that would leave one of barriers, by default all
+        # of the exit's, impossible to get through if absorbed next.
+        if barriers is None:
+            barriers = self.barriers
+        needed = self.can_open[state].intersection(barriers)
+        return [self.colors[kind] for kind in self.next_kinds(state)
+            if not needed <= self.can_open[state + self.strides[kind]]]
+    
+    def to_absorb(self, state, barrier):
+        # The fewest cubes to absorb from state to get through barrier, as a
+        # list of [(color, count)], or None if it can't be done.
+        if barrier not in self.can_open[state]:
+            return None
+        have = self.state_counts(state)
+        best = None
+        for way in range(self.states):
+            counts = self.state_counts(way)
+            if self.color[way] != self.barrier_colors[barrier]:
+                continue
+            if [k for k in range(len(counts)) if counts[k] < have[k]]:
+                continue
+            more = [(self.colors[k], counts[k] - have[k]) for k in range(len(counts)) if counts[k] > have[k]]
+            if best is None or sum(n for (c, n) in more) < sum(n for (c, n) in best):
+                best = more
+        return best
+    
+    def passed(self, barrier, x):
+        # whether the player at x is past barrier, towards the exit
+        return self.barrier_sides[barrier] * (self.barrier_x[barrier] - x) <= 0
+
+def _cubes_text(colors):
+    names = []
+    for (color, count) in colors:
+        name = color_name(color)
+        if count > 1:
+            name = '%d %s cubes' % (count, name)
+        names.append(name)
+    if len(names) > 1:
+        return ', '.join(names[:-1]) + ' and ' + names[-1]
+    return names[0]
+
+def hint(world):
+    # What the player of world should do next, as a sentence.
+    level = world.compiled
+    if not level or not world.player_block:
+        return None
+    table = level.color_table()
+    player = world.player_block
+    absorbed = [i for (i, cube) in enumerate(world.cubes) if cube not in world.block_group]
+    state = table.state(absorbed)
+    
+    ahead = [b for b in table.barriers if not table.passed(b, player.pos[0])]
+    if not ahead:
+        return 'Head for the exit.'
+    barrier = ahead[0]
+    name = color_name(table.barrier_colors[barrier])
+    if barrier not in table.can_open[0]:
+        return 'There is no way to turn %s on this level.' % name
+    if barrier not in table.can_open[state]:
+        return 'You can\'t turn %s any more, press r to start again.' % name
+    if player.color == table.barrier_colors[barrier]:
+        text = 'You can get through the %s barrier now.' % name
+    else:
+        text = 'Absorb %s to turn %s.' % (_cubes_text(table.to_absorb(state, barrier)), name)
+    traps = table.traps(state, ahead)
+    if traps:
+        text += ' Keep away from %s.' % _cubes_text([(color, 1) for color in traps])
+    return text
@@ -0,0 +1,314 @@
+# This is a game called "Color Cube".
+#
+# Color Cube is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Color Cube is distributed in the hope that it will be useful and maybe even fun,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Color Cube.  If not, see <http://www.gnu.org/licenses/>.
+#
+# copyright  2013 onwards Andrew Davis
+# license    http://www.gnu.org/copyleft/gpl.html GNU GPL v3 or later
+
+# The game as an environment for training agents, in the style of gym:
+# reset() starts a level and step(action) plays an action, returning
+# (observation, reward, done, info).
+#
+# An action is an index into solver.ACTIONS: which way to go, and whether to
+# jump, held for ticks_per_action ticks. An observation is a flat float32
+# array, the same layout for every environment:
+#
+#   0  1   player position, as a fraction of the screen
+#   2  3   player velocity
+#   4 - 6  player color, 1 is full brightness
+#   7 - 9  the color of the level's first barrier
+#   10     1 if the player is the barrier's color
+#   11 12  exit position
+#   then for each of max_cubes cubes: position (2), sideways velocity, color
+#   (3) and 1 if it hasnt been absorbed
+#
+# Env plays one World. VecEnv plays many environments in one BatchWorld, and
+# SubprocVecEnv shares them out between worker processes, each with a VecEnv,
+# which write observations straight into shared memory. Vectorised
+# environments start a finished environment's level again by themselves, and
+# the observation they return for it is the new start.
+#
+# Env.render() gives the screen as pixels, see render.ArrayRenderer.
+
+import multiprocessing
+from multiprocessing.sharedctypes import RawArray
+
+import numpy
+
+from colorcube.batch import *
+from colorcube.solver import ACTIONS, apply_actions
+from colorcube.render import ArrayRenderer
+
+PLAYER_SIZE = 13
+CUBE_SIZE = 7
+
+def observation_size(max_cubes):
+    return PLAYER_SIZE + CUBE_SIZE * max_cubes
+
+class Rewards:
+    # what an action earns, per tick for the costs
+    exit = 1.0
+    barrier = -0.01
+    tick = -0.001
+
+class Env:
+    
+    def __init__(self, levels=None, max_cubes=8, ticks_per_action=4, max_ticks=3000, rewards=Rewards,
+                 render_size=None, render_every=1):
+        self.world = World(levels)
+        self.max_cubes = max_cubes
+        self.ticks_per_action = ticks_per_action
+        self.max_ticks = max_ticks
+        self.rewards = rewards
+        self.observation_size = observation_size(max_cubes)
+        self.action_count = len(ACTIONS)
+        self.cubes = []
+        self.render_size = render_size
+        self.render_every = render_every
+        self.renderer = None
+    
+    def reset(self, level=1):
+        if level == self.world.level and self.world.start:
+            self.world.restart()
+        elif not self.world.setup_level(level):
+            raise ValueError('there is no level %r' % (level,))
+        # cubes keep their place in the observation after being absorbed
+        self.cubes = list(self.world.block_group)[:self.max_cubes]
+        return self.observation()
+    
+    def step(self, action):
+        world = self.world
+        player = world.player_block
+        (dx, jump) = ACTIONS[action]
+        player.vel[0] = dx * g.block_move
+        if jump:
+            player.jump()
+        
+        events = []
+        ticks = 0
+        for i in range(self.ticks_per_action):
+            if world.reached_exit:
+                break
+            events += world.step()
+            ticks += 1
+        
+        # only the ticks played cost anything, as in VecEnv
+        reward = self.rewards.tick * ticks
+        reward += self.rewards.barrier * events.count(EVENT_BARRIER)
+        if world.reached_exit:
+            reward += self.rewards.exit
+        done = world.reached_exit or world.time >= self.max_ticks
+        return self.observation(), reward, done, {'events': events, 'time': world.time}
+    
+    def render(self):
+        # The screen as a (height, width, 3) uint8 array, render_size if that
+        # was given. The same array is updated every time.
+        if self.renderer is None:
+            self.renderer = ArrayRenderer(self.render_size, self.render_every)
+        return self.renderer.render(self.world)
+    
+    def observation(self):
+        world = self.world
+        obs = numpy.zeros(self.observation_size, numpy.float32)
+        scale = (float(g.width), float(g.height))
+        player = world.player_block
+        obs[0:2] = numpy.divide(player.pos, scale)
+        obs[2:4] = player.vel
+        obs[4:7] = numpy.divide(player.color, 255.0)
+        barriers = list(world.barrier_group)
+        if barriers:
+            obs[7:10] = numpy.divide(barriers[0].color, 255.0)
+            obs[10] = player.color == barriers[0].color
+        else:
+            obs[10] = 1
+        obs[11:13] = numpy.divide(world.exit.pos, scale)
+        for i, cube in enumerate(self.cubes):
+            j = PLAYER_SIZE + CUBE_SIZE * i
+            obs[j:j + 2] = numpy.divide(cube.pos, scale)
+            obs[j + 2] = cube.vel[0]
+            obs[j + 3:j + 6] = numpy.divide(cube.color, 255.0)
+            obs[j + 6] = cube in world.block_group
+        return obs
+
+class VecEnv:
+    
+    def __init__(self, levels, pack=None, max_cubes=8, ticks_per_action=4, max_ticks=3000, rewards=Rewards):
+        # levels is the level each environment plays, pack the LevelPack
+        # they come from, by default the game's own.
+        self.max_cubes = max_cubes
+        self.ticks_per_action = ticks_per_action
+        self.max_ticks = max_ticks
+        self.rewards = rewards
+        self.observation_size = observation_size(max_cubes)
+        self.action_count = len(ACTIONS)
+        
+        # every environment is a copy of one of these, at the start of its level
+        distinct = sorted(set(levels))
+        worlds = []
+        for level in distinct:
+            w = World(pack)
+            if not w.setup_level(level):
+                raise ValueError('there is no level %r' % (level,))
+            worlds.append(w)
+        self.starts = BatchWorld(worlds)
+        self.start_rows = numpy.array([distinct.index(level) for level in levels], numpy.int64)
+        self.count = len(levels)
+        self.batch = None
+    
+    def reset(self):
+        self.batch = self.starts.take(self.start_rows)
+        return self.observations()
+    
+    def step(self, actions):
+        # actions is one index into ACTIONS per environment
+        batch = self.batch
+        apply_actions(batch, numpy.asarray(actions))
+        
+        rewards = numpy.zeros(self.count, numpy.float32)
+        for i in range(self.ticks_per_action):
+            active = ~batch.reached_exit
+            (absorbed, barrier, exit) = batch.step()
+            rewards += active * self.rewards.tick
+            rewards += barrier * self.rewards.barrier
+            rewards += exit * self.rewards.exit
+        
+        dones = batch.reached_exit | (batch.time >= self.max_ticks)
+        done = numpy.flatnonzero(dones)
+        if len(done):
+            self._restart(done)
+        return self.observations(), rewards, dones, {}
+    
+    def _restart(self, rows):
+        batch = self.batch
+        starts = self.start_rows[rows]
+        for name in per_world:
+            getattr(batch, name)[rows] = getattr(self.starts, name)[starts]
+    
+    def observations(self, out=None):
+        # One observation per row, into out if given.
+        batch = self.batch
+        if out is None:
+            out = numpy.zeros((self.count, self.observation_size), numpy.float32)
+        scale = numpy.array([g.width, g.height], numpy.float64)
+        out[:, 0:2] = batch.pos[:, 0] / scale
+        out[:, 2:4] = batch.vel[:, 0]
+        out[:, 4:7] = batch.color[:, 0] / 255.0
+        if batch.barrier_count:
+            barrier = batch.color[:, batch.first_barrier]
+            out[:, 7:10] = barrier / 255.0
+            out[:, 10] = (batch.color[:, 0] == barrier).all(axis=1)
+        else:
+            out[:, 7:10] = 0
+            out[:, 10] = 1
+        out[:, 11:13] = batch.pos[:, 1] / scale
+        
+        cubes = min(self.max_cubes, batch.block_count)
+        blocks = slice(batch.first_block, batch.first_block + cubes)
+        view = out[:, PLAYER_SIZE:].reshape(self.count, self.max_cubes, CUBE_SIZE)
+        view[:] = 0
+        view[:, :cubes, 0:2] = batch.pos[:, blocks] / scale
+        view[:, :cubes, 2] = batch.vel[:, blocks, 0]
+        view[:, :cubes, 3:6] = batch.color[:, blocks] / 255.0
+        view[:, :cubes, 6] = batch.alive[:, blocks]
+        return out
+
+def _worker(conn, levels, pack, options, shared, first):
+    # Runs a VecEnv for environments first onwards, reading actions from and
+    # writing results to the shared arrays.
+    (obs, rewards, dones, actions) = [_view(*array) for array in shared]
+    env = VecEnv(levels, pack, **options)
+    n = env.count
+    rows = slice(first, first + n)
+    try:
+        while True:
+            command = conn.recv()
+            if command == 'reset':
+                env.reset()
+                env.observations(obs[rows])
+            elif command == 'step':
+                (o, r, d, info) = env.step(actions[rows])
+                obs[rows] = o
+                rewards[rows] = r
+                dones[rows] = d
+            elif command == 'close':
+                return
+            conn.send(True)
+    finally:
+        conn.close()
+
+def _shared(shape, dtype, ctype):
+    # (raw, dtype, shape), raw being shared memory processes can inherit
+    return RawArray(ctype, int(numpy.prod(shape))), dtype, shape
+
+def _view(raw, dtype, shape):
+    return numpy.frombuffer(raw, dtype).reshape(shape)
+
+class SubprocVecEnv:
+    
+    def __init__(self, levels, pack=None, processes=None, **options):
+        # Like VecEnv, with the environments shared out between processes.
+        if processes is None:
+            processes = multiprocessing.cpu_count()
+        processes = max(1, min(processes, len(levels)))
+        self.count = len(levels)
+        self.observation_size = observation_size(options.get('max_cubes', 8))
+        self.action_count = len(ACTIONS)
+        
+        shape = (self.count, self.observation_size)
+        shared = [
+            _shared(shape, numpy.float32, 'f'),
+            _shared((self.count,), numpy.float32, 'f'),
+            _shared((self.count,), numpy.uint8, 'B'),
+            _shared((self.count,), numpy.int32, 'i'),
+        ]
+        (self.obs, self.rewards, self.dones, self.actions) = [_view(*array) for array in shared]
+        
+        self.conns = []
+        self.workers = []
+        for part in numpy.array_split(numpy.arange(self.count), processes):
+            ours, theirs = multiprocessing.Pipe()
+            worker = multiprocessing.Process(target=_worker,
+                args=(theirs, [levels[i] for i in part], pack, options, shared, int(part[0])))
+            worker.daemon = True
+            worker.start()
+            theirs.close()
+            self.conns.append(ours)
+            self.workers.append(worker)
+    
+    def _all(self, command):
+        for conn in self.conns:
+            conn.send(command)
+        for conn in self.conns:
+            conn.recv()
+    
+    def reset(self):
+        self._all('reset')
+        return self.obs
+    
+    def step(self, actions):
+        # The arrays returned are overwritten by the next step, copy them to keep them.
+        self.actions[:] = actions
+        self._all('step')
+        return self.obs, self.rewards, self.dones.view(bool), {}
+    
+    def close(self):
+        for conn in self.conns:
+            try:
+                conn.send('close')
+            except IOError:
+                pass
+        for worker in self.workers:
+            worker.join()
+        self.conns = []
+        self.workers = []
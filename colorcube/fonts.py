@@ -0,0 +1,77 @@
+# This is a game called "Color Cube".
+#
+# Color Cube is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Color Cube is distributed in the hope that it will be useful and maybe even fun,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Color Cube.  If not, see <http://www.gnu.org/licenses/>.
+#
+# copyright  2013 onwards Andrew Davis
+# license    http://www.gnu.org/copyleft/gpl.html GNU GPL v3 or later
+
+# Fonts and rendered text, looked up once per process.
+#
+# Finding a system font means scanning every font installed, so each font name
+# is only looked up once and the font files found are remembered. A font file
+# bundled as resources/fonts/<name>.ttf is used instead of a system font, which
+# skips the scan completely.
+#
+# Rendered text is cached as well. The surfaces handed out are shared so they
+# must never be drawn on.
+
+import os, pygame
+
+from colorcube.lru import LRUCache
+
+fonts_dir = os.path.join('resources', 'fonts')
+
+class FontRegistry:
+    
+    def __init__(self, max_texts=128):
+        self.paths = {}
+        self.fonts = {}
+        self.texts = LRUCache(max_texts)
+    
+    def font_path(self, name):
+        # The file for a font name, or None for pygame's default font.
+        if name not in self.paths:
+            bundled = os.path.join(fonts_dir, name + '.ttf')
+            if os.path.exists(bundled):
+                self.paths[name] = bundled
+            else:
+                self.paths[name] = pygame.font.match_font(name)
+        return self.paths[name]
+    
+    def get_font(self, name, size):
+        key = (name, size)
+        font = self.fonts.get(key)
+        if font is None:
+            if not pygame.font.get_init():
+                pygame.font.init()
+            font = pygame.font.Font(self.font_path(name), size)
+            self.fonts[key] = font
+        return font
+    
+    def render(self, name, size, text, antialias, color, background=None):
+        key = (name, size, text, antialias, color, background)
+        def draw():
+            font = self.get_font(name, size)
+            if background is None:
+                return font.render(text, antialias, color)
+            return font.render(text, antialias, color, background)
+        return self.texts.get(key, draw)
+
+registry = FontRegistry()
+
+def get_font(name, size):
+    return registry.get_font(name, size)
+
+def render_text(name, size, text, antialias, color, background=None):
+    return registry.render(name, size, text, antialias, color, background)
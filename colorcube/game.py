@@ -0,0 +1,340 @@
+# This is a game called "Color Cube".
+#
+# Color Cube is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Color Cube is distributed in the hope that it will be useful and maybe even fun,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Color Cube.  If not, see <http://www.gnu.org/licenses/>.
+#
+# copyright  2013 onwards Andrew Davis
+# license    http://www.gnu.org/copyleft/gpl.html GNU GPL v3 or later
+
+# The game itself: the window, the main loop and the screens around the levels.
+#
+# Importing this does nothing but define things. run() opens the window and
+# plays, fonts are set up the first time text is drawn and the sound system
+# by the thread that loads the sounds.
+
+import os, pygame
+from pygame.locals import *
+
+from colorcube.world import *
+from colorcube.render import DirtyRenderer, draw_world
+from colorcube.fonts import get_font
+from colorcube.colors import hint
+from colorcube.replay import Recorder
+from colorcube.profiler import FrameProfiler
+
+# set up by init()
+screen = None
+world = None
+renderer = None
+
+# set with --record to save the keys pressed while playing
+record_path = None
+recorder = None
+
+# set with --profile to time every phase of every frame
+profiler = None
+
+def init():
+    global screen, world, renderer
+    if screen:
+        return
+    if not pygame.font: print 'Warning, fonts disabled'
+    if not pygame.mixer: print 'Warning, sound disabled'
+    
+    pygame.display.init()
+    screen = pygame.display.set_mode((g.width, g.height))
+    pygame.display.set_caption('Blocks')
+    pygame.mouse.set_visible(0)
+    
+    g.init_sound()
+    
+    # below 60 ticks a second each tick covers more, see World
+    world = World(dt=step_size(g.tick_rate))
+    renderer = DirtyRenderer(screen)
+
+def key_down(k):
+    global recorder
+    if g.state_splash:
+        if k == K_SPACE:
+            g.state_splash = False
+            g.state_playing = True
+            setup_level(g.level)
+            if record_path:
+                recorder = Recorder(record_path, g.level, dt=world.dt)
+            return
+    elif g.state_over:
+        if k == K_SPACE:
+            g.level = 1
+            g.state_over = False
+            g.state_playing = True
+            setup_level(g.level)
+    if k == K_p or k == K_h:
+        if g.state_playing:
+            g.state_paused = not g.state_paused
+            g.hint = None
+            if k == K_h and g.state_paused:
+                g.hint = hint(world)
+            renderer.invalidate()
+        return
+
+    if recorder and g.state_playing:
+        recorder.key(k, True)
+    
+    if k == K_r:
+        if g.state_playing:
+            renderer.invalidate()
+            world.restart()
+        else:
+            setup_level(g.level)
+    else:
+        world.key_down(k)
+
+def key_up(k):
+    if recorder and g.state_playing:
+        recorder.key(k, False)
+    world.key_up(k)
+
+def setup_level(level):
+    global recorder
+    renderer.invalidate()
+    if not world.setup_level(level):
+        g.state_playing = False
+        g.state_over = True
+        if recorder:
+            # the recording ends with the game, playing again isnt recorded
+            recorder.close()
+            recorder = None
+
+def draw_splash(screen):
+
+    if not g.splash_surface:
+        g.splash_surface = pygame.Surface(g.splash_size).convert()
+
+        font = get_font("arial", 24)
+        
+        text = font.render("Color Cube", g.text_antialias, g.text_color, g.text_bg_color)
+        g.splash_surface.blit(text, (10, 20))
+        
+        font = get_font("arial", 18)
+        
+        text = font.render("You are a poor colorless cube looking to escape.", g.text_antialias, g.text_color, g.text_bg_color)
+        g.splash_surface.blit(text, (10, 80))
+        
+        text = font.render("Use the left and right arrows to move.", g.text_antialias, g.text_color, g.text_bg_color)
+        g.splash_surface.blit(text, (10, 150))
+        
+        text = font.render("Space to jump.", g.text_antialias, g.text_color, g.text_bg_color)
+        g.splash_surface.blit(text, (10, 180))
+        
+        text = font.render("r to restart a level.", g.text_antialias, g.text_color, g.text_bg_color)
+        g.splash_surface.blit(text, (10, 210))
+        
+        text = font.render("p to pause, h for a hint.", g.text_antialias, g.text_color, g.text_bg_color)
+        g.splash_surface.blit(text, (10, 240))
+        
+        text = font.render("Press space to begin.", g.text_antialias, g.text_color, g.text_bg_color)
+        g.splash_surface.blit(text, (10, 270))
+    
+    splash_dest_rect = pygame.Rect((g.width/2) - (g.splash_size[0]/2), (g.height/2) - (g.splash_size[1]/2), g.splash_size[0], g.splash_size[1])
+    screen.blit(g.splash_surface, splash_dest_rect)
+
+def draw_end_game_screen(screen):
+
+    if not g.end_surface:
+        g.end_surface = pygame.Surface(g.splash_size).convert()
+        
+        font = get_font("arial", 18)
+        
+        text = font.render("Congratulations! You are truly a human color wheel.", g.text_antialias, g.text_color, g.text_bg_color)
+        g.end_surface.blit(text, (10, 20))
+        
+        text = font.render("Press space to play again", g.text_antialias, g.text_color, g.text_bg_color)
+        g.end_surface.blit(text, (10, 80))
+
+    dest_rect = pygame.Rect((g.width/2) - (g.splash_size[0]/2), (g.height/2) - (g.splash_size[1]/2), g.splash_size[0], g.splash_size[1])
+    screen.blit(g.end_surface, dest_rect)
+
+def draw_pause_screen(screen, bg):
+    
+    if not g.pause_surface:
+        font = get_font("arial", 24)
+        g.pause_surface = font.render("Paused, p to carry on", g.text_antialias, g.text_color, g.text_bg_color)
+    
+    draw_world(screen, bg, world)
+    dest_rect = g.pause_surface.get_rect(center=(g.width/2, g.height/2))
+    screen.blit(g.pause_surface, dest_rect)
+    
+    if g.hint:
+        font = get_font("arial", 18)
+        text = font.render(g.hint, g.text_antialias, g.text_color, g.text_bg_color)
+        screen.blit(text, text.get_rect(center=(g.width/2, dest_rect.bottom + 30)))
+
+# pygame.event.wait only takes a timeout from pygame 2, before that a timer
+# event wakes it instead
+wait_has_timeout = pygame.version.vernum[0] >= 2
+WAKE_EVENT = USEREVENT
+
+def wait_events(timeout):
+    # The events there are, waiting up to timeout ms for one if there are none.
+    if wait_has_timeout:
+        event = pygame.event.wait(timeout)
+    else:
+        pygame.time.set_timer(WAKE_EVENT, timeout)
+        event = pygame.event.wait()
+        pygame.time.set_timer(WAKE_EVENT, 0)
+    if event.type == NOEVENT or event.type == WAKE_EVENT:
+        return []
+    return [event] + pygame.event.get()
+
+def main():
+    clock = pygame.time.Clock()
+    
+    bg = pygame.Surface(screen.get_size()).convert()
+    bg.fill((0,0,0))
+    
+    event_sounds = {
+        EVENT_ABSORB: g.suck_sound,
+        EVENT_BARRIER: g.barrier_sound,
+        EVENT_EXIT: g.cheer_sound,
+    }
+
+    # seconds the world is behind the clock, it steps whenever that is a whole tick
+    tick = 1.0 / g.tick_rate
+    lag = 0.0
+    
+    # whether the splash, end or pause screen showing is up to date, it is
+    # drawn again after every event
+    idle_drawn = False
+    
+    while 1:
+        # while idle the frame starts once there are events, so sleeping
+        # waiting for them isnt timed, otherwise getting them is
+        idle = idle_drawn and (g.state_splash or g.state_over or g.state_paused)
+        if idle:
+            events = wait_events(g.idle_timeout)
+            if not events:
+                continue
+            clock.tick()
+            lag = 0.0
+        else:
+            lag += clock.tick(g.frame_rate) / 1000.0
+        g.time += 1
+        
+        if profiler:
+            profiler.begin_frame()
+            profiler.begin('events')
+        if not idle:
+            events = pygame.event.get()
+        for event in events:
+            if event.type == QUIT:
+                return
+            elif event.type == KEYDOWN:
+                if event.key == K_ESCAPE:
+                    return
+                elif event.key == K_F3 and profiler:
+                    profiler.overlay = not profiler.overlay
+                    renderer.invalidate()
+                else:
+                    key_down(event.key)
+            elif event.type == KEYUP:
+                key_up(event.key)
+        if profiler:
+            profiler.end('events')
+
+        idle_drawn = False
+        if g.state_splash:
+            lag = 0.0
+            draw_splash(screen)
+            pygame.display.flip()
+            idle_drawn = True
+        elif g.state_paused:
+            lag = 0.0
+            draw_pause_screen(screen, bg)
+            pygame.display.flip()
+            idle_drawn = True
+        elif g.state_playing:
+            if lag > tick * g.max_ticks_per_frame:
+                lag = tick * g.max_ticks_per_frame
+            while lag >= tick and g.state_playing:
+                lag -= tick
+                for event in world.step(profiler):
+                    event_sounds[event].play()
+                if recorder:
+                    recorder.stepped(world)
+                
+                if world.reached_exit:
+                    # player has reached the exit
+                    g.level += 1
+                    setup_level(g.level)
+            # how far it is to the next tick
+            alpha = lag / tick
+            
+            show_overlay = profiler and profiler.overlay
+            if profiler:
+                profiler.begin('draw')
+            if g.dirty_rendering:
+                also = show_overlay and [profiler.overlay_rect()] or []
+                rects = renderer.draw(world, also, alpha)
+            else:
+                draw_world(screen, bg, world, alpha)
+            if profiler:
+                profiler.end('draw')
+            
+            if show_overlay:
+                profiler.draw_overlay(screen)
+            
+            if profiler:
+                profiler.begin('flip')
+            if g.dirty_rendering:
+                pygame.display.update(rects)
+            else:
+                pygame.display.flip()
+            if profiler:
+                profiler.end('flip')
+        elif g.state_over:
+            lag = 0.0
+            draw_end_game_screen(screen)
+            pygame.display.flip()
+            idle_drawn = True
+        
+        if profiler:
+            profiler.end_frame()
+
+def run(argv=None):
+    global record_path, profiler
+    from optparse import OptionParser
+    parser = OptionParser()
+    parser.add_option('--record', metavar='FILE', help='record the keys pressed while playing, see replay.py')
+    parser.add_option('--profile', metavar='FILE', help='time every frame and save a Chrome trace to FILE, F3 shows the timings')
+    parser.add_option('--fps', type='int', default=g.frame_rate, help='frames drawn a second, 0 for as many as possible; the game runs at the same speed either way')
+    parser.add_option('--tick-rate', type='int', default=g.tick_rate, help='world steps a second, one that divides 60; fewer steps cover more each')
+    (options, args) = parser.parse_args(argv)
+    try:
+        step_size(options.tick_rate)
+    except ValueError, e:
+        parser.error(str(e))
+    record_path = options.record
+    g.frame_rate = options.fps
+    g.tick_rate = options.tick_rate
+    if options.profile:
+        profiler = FrameProfiler(budget=1.0 / (g.frame_rate or g.tick_rate))
+    init()
+    main()
+    if recorder:
+        recorder.close()
+    if profiler:
+        profiler.export(options.profile)
+
+if __name__ == '__main__':
+    run()
+
@@ -0,0 +1,216 @@
+# This is a game called "Color Cube".
+#
+# Color Cube is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Color Cube is distributed in the hope that it will be useful and maybe even fun,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Color Cube.  If not, see <http://www.gnu.org/licenses/>.
+#
+# copyright  2013 onwards Andrew Davis
+# license    http://www.gnu.org/copyleft/gpl.html GNU GPL v3 or later
+
+# Making levels at random, for building puzzle packs offline.
+#
+# Levels keep the layout of the hand made ones: the player and the exit on the
+# floor, a barrier in front of the exit and rows of platforms a jump apart.
+# Each row has one or two gaps somewhere to drop through, and cubes of the
+# primary colors wander the rows. The barrier's color is always one the player
+# can make, by absorbing a cube of each of some of the colors in the level;
+# any other cubes are there to be avoided.
+#
+# Levels are made batch_size at a time, with numpy making every random choice
+# for a batch at once. Batch n of a seed is always the same, so a stream can
+# be split between processes and picked up part way through. write_packs()
+# writes each batch as a level pack that load_levels() can read, so memory
+# stays bounded however many levels are made.
+#
+#   python -m colorcube.generator out_dir --count 1000000
+
+import os, json
+import numpy
+
+from colorcube.sprites import g
+from colorcube.colors import COLOR_NAMES, mask_color
+
+# Colors are made of red, green and blue as bits 1, 2 and 4, so the colors a
+# set of cubes can make are the nonzero submasks of their bits or-ed together.
+
+# shared by every generated level
+DEFAULTS = {
+    'exit': {'pos': [765, 563], 'size': [50, 75], 'color': [255, 255, 255]},
+    'player': {'pos': [650, 560], 'color': list(g.player_start_color)},
+}
+
+class LevelGenerator:
+    
+    def __init__(self, seed=0, batch_size=1000, rows=4, max_cubes=5, gap_width=116, min_platform=80):
+        self.seed = seed
+        self.batch_size = batch_size
+        self.rows = rows
+        self.max_cubes = max_cubes
+        self.gap_width = gap_width
+        self.min_platform = min_platform
+        # a jump only just gets the player up to the next row
+        self.spacing = 3 * g.block_size[1]
+        self.floor = {'pos': [g.width / 2, g.height - 2], 'size': [g.width, g.platform_thickness]}
+        self.barrier_pos = [700, 540]
+        self.barrier_size = [5, self.spacing]
+    
+    def batch(self, index, count=None):
+        # Level dicts for batch index, the levels after index * batch_size.
+        n = count or self.batch_size
+        rs = numpy.random.RandomState([self.seed, index])
+        rows = self.rows
+        cubes = self.max_cubes
+        half = g.block_size[0] / 2
+        
+        # where the gaps in each row start, a second gap only if it fits
+        gaps = rs.randint(self.min_platform, g.width - self.min_platform - self.gap_width, (n, rows, 2))
+        gaps.sort(axis=2)
+        two_gaps = rs.rand(n, rows) < 0.35
+        two_gaps &= gaps[:, :, 1] - gaps[:, :, 0] >= self.gap_width + self.min_platform
+        
+        # the cubes, each on a row and out of the gaps
+        cube_count = rs.randint(2, cubes + 1, n)
+        cube_row = rs.randint(0, rows, (n, cubes))
+        cube_x = rs.randint(half, g.width - half, (n, cubes))
+        cube_bit = 1 << rs.randint(0, 3, (n, cubes))
+        # either way, so cubes that start together dont stay together
+        cube_vel = (rs.randint(0, 2, (n, cubes)) * 2 - 1) * g.block_move
+        for k in (0, 1):
+            start = gaps[numpy.arange(n)[:, None], cube_row, k]
+            in_gap = (cube_x > start - half) & (cube_x < start + self.gap_width + half)
+            if k == 1:
+                in_gap &= two_gaps[numpy.arange(n)[:, None], cube_row]
+            cube_x = numpy.where(in_gap, start - half - 1, cube_x)
+        
+        # a color the cubes can make, a random part of all they have
+        present = numpy.zeros(n, int)
+        for c in range(cubes):
+            present |= numpy.where(c < cube_count, cube_bit[:, c], 0)
+        barrier = rs.randint(1, 8, n) & present
+        barrier = numpy.where(barrier == 0, present, barrier)
+        
+        first = index * self.batch_size
+        gaps, two_gaps = gaps.tolist(), two_gaps.tolist()
+        cube_count, cube_row, cube_x, cube_bit = cube_count.tolist(), cube_row.tolist(), cube_x.tolist(), cube_bit.tolist()
+        cube_vel = cube_vel.tolist()
+        barrier = barrier.tolist()
+        levels = []
+        for i in range(n):
+            platforms = []
+            for r in range(rows):
+                y = self.spacing * (r + 1)
+                edges = [0]
+                for k in range(1 + two_gaps[i][r]):
+                    edges += [gaps[i][r][k], gaps[i][r][k] + self.gap_width]
+                edges.append(g.width)
+                for left, right in zip(edges[::2], edges[1::2]):
+                    platforms.append({'pos': [(left + right) / 2, y], 'size': [right - left, g.platform_thickness]})
+            platforms.append(self.floor)
+            levels.append({
+                'description': 'generated %d:%d, %s barrier' % (self.seed, first + i, COLOR_NAMES[barrier[i]]),
+                'platforms': platforms,
+                'barriers': [{'pos': self.barrier_pos, 'size': self.barrier_size, 'color': mask_color(barrier[i])}],
+                'cubes': [{'pos': [cube_x[i][c], self.spacing * (cube_row[i][c] + 1) - half],
+                           'vel': [cube_vel[i][c], 0], 'color': mask_color(cube_bit[i][c])}
+                          for c in range(cube_count[i])],
+            })
+        return levels
+    
+    def batches(self, count=None, start=0):
+        # Lists of levels, from batch start until count levels have been made
+        # or forever if count is None.
+        index = start
+        while count is None or index * self.batch_size < count:
+            n = self.batch_size
+            if count is not None:
+                n = min(n, count - index * self.batch_size)
+            yield self.batch(index, n)
+            index += 1
+    
+    def levels(self, count=None):
+        for batch in self.batches(count):
+            for level in batch:
+                yield level
+
+def pack(levels):
+    # the JSON for a level pack holding levels
+    return {'defaults': DEFAULTS, 'levels': levels}
+
+def pack_path(directory, index):
+    return os.path.join(directory, 'pack-%05d.json' % index)
+
+def _write_pack(job):
+    (generator, directory, index, count) = job
+    path = pack_path(directory, index)
+    tmp = path + '.tmp'
+    f = open(tmp, 'w')
+    try:
+        f.write(json.dumps(pack(generator.batch(index, count)), separators=(',', ':')))
+    finally:
+        f.close()
+    os.rename(tmp, path)
+    return path
+
+def write_packs(directory, count, seed=0, batch_size=1000, processes=None, resume=True):
+    # Write count levels as packs of batch_size levels to directory, making
+    # them in a pool of processes. With resume, packs already written are kept.
+    # Returns the paths of every pack.
+    import multiprocessing
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+    generator = LevelGenerator(seed, batch_size)
+    jobs = []
+    paths = []
+    for index in range((count + batch_size - 1) / batch_size):
+        n = min(batch_size, count - index * batch_size)
+        paths.append(pack_path(directory, index))
+        if not (resume and os.path.exists(paths[-1])):
+            jobs.append((generator, directory, index, n))
+    if processes == 1:
+        for job in jobs:
+            _write_pack(job)
+    elif jobs:
+        pool = multiprocessing.Pool(processes)
+        try:
+            # each worker only ever holds the batch it is writing
+            for path in pool.imap(_write_pack, jobs):
+                pass
+        finally:
+            pool.close()
+            pool.join()
+    return paths
+
+def main(argv):
+    import time
+    from optparse import OptionParser
+    parser = OptionParser(usage='%prog directory [options]')
+    parser.add_option('--count', type='int', default=1000, help='how many levels to make')
+    parser.add_option('--seed', type='int', default=0)
+    parser.add_option('--batch-size', type='int', default=1000, help='levels in each pack')
+    parser.add_option('--processes', type='int', help='worker processes, all the cpus by default')
+    (options, args) = parser.parse_args(argv[1:])
+    if len(args) != 1:
+        parser.error('where should the levels go?')
+    
+    batches = (options.count + options.batch_size - 1) / options.batch_size
+    done = len([i for i in range(batches) if os.path.exists(pack_path(args[0], i))])
+    start = time.time()
+    paths = write_packs(args[0], options.count, options.seed, options.batch_size, options.processes)
+    elapsed = max(time.time() - start, 1e-6)
+    made = min(options.count, (len(paths) - done) * options.batch_size)
+    print '%d levels in %d packs, %d packs were already there, %.0f levels/s' % (
+        options.count, len(paths), done, made / elapsed)
+    return 0
+
+if __name__ == '__main__':
+    import sys
+    sys.exit(main(sys.argv))
@@ -0,0 +1,95 @@
+# This is a game called "Color Cube".
+#
+# Color Cube is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Color Cube is distributed in the hope that it will be useful and maybe even fun,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Color Cube.  If not, see <http://www.gnu.org/licenses/>.
+#
+# copyright  2013 onwards Andrew Davis
+# license    http://www.gnu.org/copyleft/gpl.html GNU GPL v3 or later
+
+# Sprite images shared between sprites that look the same.
+#
+# Images are keyed on what they look like, (kind, size, color, border width),
+# so a sprite only gets a new image when one of those changes. Images handed
+# out are shared, so they must never be drawn on.
+
+import pygame
+from pygame.locals import *
+
+from colorcube.fonts import render_text
+from colorcube.lru import LRUCache
+
+KIND_FILL = 'fill'
+KIND_PLAYER = 'player'
+KIND_BALL = 'ball'
+KIND_EXIT = 'exit'
+
+def make_surface(size):
+    # Surfaces are only converted to the display format once a window exists.
+    surface = pygame.Surface(size)
+    if pygame.display.get_init() and pygame.display.get_surface():
+        surface = surface.convert()
+    return surface
+
+def draw_fill(size, color, border):
+    image = make_surface(size)
+    image.fill(color)
+    return image
+
+def draw_player(size, color, border):
+    # Fill with white then draw a smaller rectangle of the player's current color.
+    # This is to give the appearance of having a border.
+    image = make_surface(size)
+    image.fill((255,255,255))
+    r = Rect((border, border), (size[0] - 2*border, size[1] - 2*border))
+    pygame.draw.rect(image, color, r)
+    return image
+
+def draw_ball(size, color, border):
+    image = make_surface(size)
+    pygame.draw.circle(image, color, (size[0]/2,size[1]/2), size[0]/2)
+    return image
+
+def draw_exit(size, color, border):
+    image = make_surface(size)
+    image.fill(color)
+    t = render_text("arial", 24, 'exit', 1, (255, 0, 0), color)
+    image.blit(t, (5, 10))
+    return image
+
+drawers = {
+    KIND_FILL: draw_fill,
+    KIND_PLAYER: draw_player,
+    KIND_BALL: draw_ball,
+    KIND_EXIT: draw_exit,
+}
+
+class ImageCache:
+    
+    def __init__(self, max_images=256):
+        self.images = LRUCache(max_images)
+    
+    def get(self, kind, size, color, border=0):
+        key = (kind, tuple(size), tuple(color), border)
+        def draw():
+            # colors add up as cubes are absorbed but can only be drawn up to 255
+            shown = tuple(min(c, 255) for c in color)
+            return drawers[kind](size, shown, border)
+        return self.images.get(key, draw)
+    
+    def clear(self):
+        self.images.clear()
+
+cache = ImageCache()
+
+def sprite_image(kind, size, color, border=0):
+    return cache.get(kind, size, color, border)
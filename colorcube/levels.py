@@ -0,0 +1,146 @@
+# This is a game called "Color Cube".
+#
+# Color Cube is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Color Cube is distributed in the hope that it will be useful and maybe even fun,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Color Cube.  If not, see <http://www.gnu.org/licenses/>.
+#
+# copyright  2013 onwards Andrew Davis
+# license    http://www.gnu.org/copyleft/gpl.html GNU GPL v3 or later
+
+# Levels are described in a JSON file, resources/levels.json for the levels
+# that come with the game. The file has a "levels" list, level 1 first, and
+# an optional "defaults" level whose keys every level gets unless it has its own.
+#
+# A level has:
+#   "exit"       {"pos", "size", "color"}
+#   "player"     {"pos", "color"}
+#   "platforms"  a list of {"pos", "size"} and optionally "color"
+#   "barriers"   a list of {"pos", "size", "color"}
+#   "cubes"      a list of {"pos", "color"} and optionally "vel" and "size"
+# Positions are the centre of the sprite, as everywhere else in the game.
+#
+# Each level is compiled the first time it is played. The exit, platforms and
+# barriers never change so the compiled level keeps them, and their collision
+# grids, and hands the same ones to every World that plays the level. Only
+# the player and the cubes are made afresh, which makes a restart cheap.
+
+import os, json
+
+from colorcube.sprites import *
+from colorcube.spatial import Grid
+from colorcube.colors import ColorTable
+
+levels_path = os.path.join('resources', 'levels.json')
+
+class LevelError(Exception):
+    pass
+
+def _pair(value):
+    return (int(value[0]), int(value[1]))
+
+def _color(value):
+    return (int(value[0]), int(value[1]), int(value[2]))
+
+class CompiledLevel:
+    
+    def __init__(self, number, data):
+        self.number = number
+        self.data = data
+        zero_vel = (0,0)
+        
+        try:
+            exit = data['exit']
+            self.exit = Exit(_pair(exit['pos']), zero_vel, _color(exit['color']), _pair(exit['size']))
+            
+            player = data['player']
+            self.player_pos = _pair(player['pos'])
+            self.player_color = _color(player.get('color', g.player_start_color))
+            
+            self.platforms = []
+            for p in data.get('platforms', ()):
+                color = _color(p.get('color', g.platform_color))
+                self.platforms.append(Platform(_pair(p['pos']), zero_vel, color, _pair(p['size'])))
+            
+            self.barriers = []
+            for b in data.get('barriers', ()):
+                self.barriers.append(Barrier(_pair(b['pos']), zero_vel, _color(b['color']), _pair(b['size'])))
+            
+            self.cubes = []
+            for c in data.get('cubes', ()):
+                vel = tuple(c.get('vel', (g.block_move, 0)))
+                size = _pair(c.get('size', g.block_size))
+                self.cubes.append((_pair(c['pos']), vel, _color(c['color']), size))
+        except (KeyError, TypeError, ValueError, IndexError), e:
+            raise LevelError('level %d is not valid: %r' % (number, e))
+        
+        self.platform_index = Grid(self.platforms)
+        self.barrier_index = Grid(self.barriers)
+        # how snapshots say which platform a sprite is on
+        self.platform_numbers = dict((p, i) for (i, p) in enumerate(self.platforms))
+        self.colors = None
+    
+    def make_blocks(self):
+        return [Block(pos, vel, color, size) for (pos, vel, color, size) in self.cubes]
+    
+    def make_player(self):
+        return Player(self.player_pos, (0,0), self.player_color, g.block_size)
+    
+    def color_table(self):
+        # The ColorTable for the level, made the first time it is asked for.
+        if self.colors is None:
+            self.colors = ColorTable(self)
+        return self.colors
+
+class LevelPack:
+    
+    def __init__(self, data, name='levels'):
+        self.name = name
+        defaults = data.get('defaults', {})
+        self.levels = []
+        for level in data['levels']:
+            merged = dict(defaults)
+            merged.update(level)
+            self.levels.append(merged)
+        self.compiled = {}
+    
+    def __len__(self):
+        return len(self.levels)
+    
+    def __contains__(self, number):
+        return 1 <= number <= len(self.levels)
+    
+    def get(self, number):
+        # The compiled level, or None if there is no such level.
+        if number not in self:
+            return None
+        compiled = self.compiled.get(number)
+        if compiled is None:
+            compiled = CompiledLevel(number, self.levels[number - 1])
+            self.compiled[number] = compiled
+        return compiled
+
+packs = {}
+
+def load_levels(path=levels_path):
+    # Level packs are read and compiled once per process.
+    path = os.path.abspath(path)
+    mtime = os.path.getmtime(path)
+    pack = packs.get(path)
+    if pack is None or pack.mtime != mtime:
+        f = open(path)
+        try:
+            pack = LevelPack(json.load(f), path)
+        finally:
+            f.close()
+        pack.mtime = mtime
+        packs[path] = pack
+    return pack
@@ -0,0 +1,52 @@
+# This is a game called "Color Cube".
+#
+# Color Cube is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Color Cube is distributed in the hope that it will be useful and maybe even fun,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Color Cube.  If not, see <http://www.gnu.org/licenses/>.
+#
+# copyright  2013 onwards Andrew Davis
+# license    http://www.gnu.org/copyleft/gpl.html GNU GPL v3 or later
+
+# A cache of at most a given number of items, which forgets the least recently
+# used item to make room for a new one. Sprite images and rendered text are
+# kept in these.
+
+from collections import OrderedDict
+
+class LRUCache:
+    
+    def __init__(self, max_items):
+        self.max_items = max_items
+        self.items = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, key, make):
+        # The item for key, calling make() for it if it isnt cached.
+        item = self.items.pop(key, None)
+        if item is None:
+            self.misses += 1
+            item = make()
+            if len(self.items) >= self.max_items:
+                # evict the least recently used
+                self.items.popitem(last=False)
+        else:
+            self.hits += 1
+        # most recently used go last
+        self.items[key] = item
+        return item
+    
+    def __len__(self):
+        return len(self.items)
+    
+    def clear(self):
+        self.items.clear()
@@ -0,0 +1,151 @@
+# This is a game called "Color Cube".
+#
+# Color Cube is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Color Cube is distributed in the hope that it will be useful and maybe even fun,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Color Cube.  If not, see <http://www.gnu.org/licenses/>.
+#
+# copyright  2013 onwards Andrew Davis
+# license    http://www.gnu.org/copyleft/gpl.html GNU GPL v3 or later
+
+# Timing each phase of each frame.
+#
+# The last max_frames frames are kept. They can be shown over the game as a
+# histogram of frame times with the worst frames broken down by phase, and
+# saved in the Chrome trace event format to load into chrome://tracing or
+# https://ui.perfetto.dev
+#
+#   python main.py --profile trace.json     F3 shows and hides the overlay
+
+import json
+
+import pygame
+
+from collections import deque
+from timeit import default_timer as timer
+
+from colorcube.fonts import get_font
+
+class Frame:
+    
+    def __init__(self, number, start):
+        self.number = number
+        self.start = start
+        self.duration = 0
+        # (phase name, start, duration) in the order they ran
+        self.phases = []
+    
+    def totals(self):
+        # time spent in each phase, as some phases run more than once a frame
+        totals = {}
+        for (name, start, duration) in self.phases:
+            totals[name] = totals.get(name, 0) + duration
+        return totals
+
+class FrameProfiler:
+    
+    def __init__(self, max_frames=600, budget=1/60.0):
+        self.frames = deque(maxlen=max_frames)
+        self.budget = budget
+        self.frame = None
+        self.count = 0
+        self.started = {}
+        self.overlay = False
+    
+    def begin_frame(self):
+        self.count += 1
+        self.frame = Frame(self.count, timer())
+    
+    def end_frame(self):
+        frame = self.frame
+        if frame:
+            frame.duration = timer() - frame.start
+            self.frames.append(frame)
+            self.frame = None
+    
+    def begin(self, name):
+        self.started[name] = timer()
+    
+    def end(self, name):
+        now = timer()
+        start = self.started.pop(name, now)
+        if self.frame:
+            self.frame.phases.append((name, start, now - start))
+    
+    def worst(self, count=3):
+        return sorted(self.frames, key=lambda f: f.duration, reverse=True)[:count]
+    
+    def over_budget(self):
+        return len([f for f in self.frames if f.duration > self.budget])
+    
+    def histogram(self, bucket=0.001, buckets=34):
+        # how many frames took each whole number of milliseconds, the last
+        # bucket being everything longer
+        counts = [0] * buckets
+        for f in self.frames:
+            counts[min(int(f.duration / bucket), buckets - 1)] += 1
+        return counts
+    
+    def trace_events(self):
+        # Chrome trace events, times in microseconds
+        events = []
+        if not self.frames:
+            return events
+        origin = self.frames[0].start
+        def event(name, start, duration, category):
+            return {'name': name, 'cat': category, 'ph': 'X', 'pid': 1, 'tid': 1,
+                'ts': (start - origin) * 1e6, 'dur': duration * 1e6}
+        for f in self.frames:
+            e = event('frame', f.start, f.duration, 'frame')
+            e['args'] = {'frame': f.number}
+            events.append(e)
+            for (name, start, duration) in f.phases:
+                events.append(event(name, start, duration, 'phase'))
+        return events
+    
+    def export(self, path):
+        f = open(path, 'w')
+        try:
+            json.dump({'traceEvents': self.trace_events(), 'displayTimeUnit': 'ms'}, f)
+        finally:
+            f.close()
+    
+    def overlay_rect(self):
+        return pygame.Rect(5, 5, 280, 130)
+    
+    def draw_overlay(self, screen):
+        # Draws the overlay and returns the rect it covers.
+        rect = self.overlay_rect()
+        screen.fill((20, 20, 20), rect)
+        font = get_font("arial", 12)
+        
+        counts = self.histogram()
+        tallest = max(counts) or 1
+        bar_width = 6
+        base = rect.top + 60
+        for i, count in enumerate(counts):
+            height = int(40.0 * count / tallest)
+            if count and not height:
+                height = 1
+            late = (i + 1) * 0.001 > self.budget
+            color = late and (220, 60, 60) or (60, 200, 60)
+            screen.fill(color, (rect.left + 5 + i * bar_width, base - height, bar_width - 1, height))
+        
+        lines = ['%d frames, %d over %.1f ms' % (len(self.frames), self.over_budget(), self.budget * 1000)]
+        for f in self.worst():
+            totals = sorted(f.totals().items(), key=lambda t: t[1], reverse=True)
+            parts = ' '.join('%s %.1f' % (name, d * 1000) for (name, d) in totals[:3])
+            lines.append('%.1f ms: %s' % (f.duration * 1000, parts))
+        y = base + 4
+        for line in lines:
+            screen.blit(font.render(line, 1, (220, 220, 220)), (rect.left + 5, y))
+            y += 15
+        return rect
@@ -0,0 +1,191 @@
+# This is a game called "Color Cube".
+#
+# Color Cube is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Color Cube is distributed in the hope that it will be useful and maybe even fun,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Color Cube.  If not, see <http://www.gnu.org/licenses/>.
+#
+# copyright  2013 onwards Andrew Davis
+# license    http://www.gnu.org/copyleft/gpl.html GNU GPL v3 or later
+
+# Drawing a World so that only the parts of the screen that changed are repainted.
+#
+# The exit, platforms and barriers dont move so they are drawn once per level
+# into a cached layer. Each frame the old and new rects of the cubes, the
+# player and the ball are painted from that layer and the moving sprites are
+# drawn over it. draw() returns the rects to pass to pygame.display.update().
+#
+# draw_world() draws everything, for when the whole screen is flipped.
+#
+# Both take alpha, how far the next tick is from the last one. Moving sprites
+# are drawn that far between where they were before the last tick and where
+# they are now, so motion is smooth whatever the frame rate.
+#
+# ArrayRenderer draws without a window into memory shared with a numpy array,
+# for agents that learn from pixels and for checking how levels look.
+
+import pygame
+
+from colorcube.world import *
+
+def lerp_rect(start, end, alpha):
+    # end when alpha is 1, start when it is 0
+    if alpha >= 1 or start == end:
+        return end
+    return pygame.Rect(int(round(start.x + (end.x - start.x) * alpha)),
+                       int(round(start.y + (end.y - start.y) * alpha)),
+                       end.width, end.height)
+
+def draw_rect(sprite, alpha=1.0):
+    # where the player, exit or ball is drawn
+    return lerp_rect(sprite.previous_rect(), pos_to_rect(sprite.pos, sprite.size), alpha)
+
+def block_rect(sprite, alpha=1.0):
+    # where a cube is drawn, cubes are drawn at their rect like any sprite in a group
+    return lerp_rect(sprite.previous_rect(), sprite.rect, alpha)
+
+def draw_world(screen, bg, world, alpha=1.0):
+    screen.blit(bg, (0, 0))
+    
+    if world.exit:
+        screen.blit(world.exit.image, draw_rect(world.exit, alpha))
+    for block in world.block_group:
+        screen.blit(block.image, block_rect(block, alpha))
+    world.barrier_group.draw(screen)
+    world.platform_group.draw(screen)
+    
+    if world.player_block:
+        screen.blit(world.player_block.image, draw_rect(world.player_block, alpha))
+    
+    if world.ball:
+        screen.blit(world.ball.image, draw_rect(world.ball, alpha))
+
+class DirtyRenderer:
+    
+    def __init__(self, screen, bg_color=(0,0,0)):
+        self.screen = screen
+        self.bg_color = bg_color
+        
+        # bg, exit, barriers and platforms, in the same format as screen
+        # so that copying from them is as fast as can be
+        self.static_layer = pygame.Surface(screen.get_size(), 0, screen)
+        # barriers and platforms alone, as they are drawn on top of the cubes
+        self.over_layer = pygame.Surface(screen.get_size(), 0, screen)
+        self.over_layer.set_colorkey(bg_color)
+        
+        self.invalidate()
+    
+    def invalidate(self):
+        # Rebuild the cached layer and repaint everything on the next draw(),
+        # for example after setup_level() or after another screen was shown.
+        self.valid = False
+        self.drawn = {}
+    
+    def _moving(self, world, alpha):
+        # moving sprites in the order main() has always drawn them
+        sprites = [(s, block_rect(s, alpha)) for s in world.block_group]
+        for s in (world.player_block, world.ball):
+            if s:
+                sprites.append((s, draw_rect(s, alpha)))
+        return sprites
+    
+    def _build_static(self, world):
+        self.static_layer.fill(self.bg_color)
+        self.over_layer.fill(self.bg_color)
+        if world.exit:
+            self.static_layer.blit(world.exit.image, draw_rect(world.exit))
+        for layer in (self.static_layer, self.over_layer):
+            world.barrier_group.draw(layer)
+            world.platform_group.draw(layer)
+        self.valid = True
+    
+    def draw(self, world, also=(), alpha=1.0):
+        # also is any other rects to repaint, such as where something is drawn on top
+        if not self.valid:
+            self._build_static(world)
+            self.screen.blit(self.static_layer, (0, 0))
+            dirty = [self.screen.get_rect()]
+        else:
+            dirty = list(also)
+        
+        moving = self._moving(world, alpha)
+        drawn = {}
+        for sprite, rect in moving:
+            # sprites get a new image whenever they look different
+            drawn[sprite] = (rect, sprite.image)
+            if self.drawn.get(sprite) != drawn[sprite]:
+                dirty.append(rect)
+        for sprite, (rect, image) in self.drawn.items():
+            if drawn.get(sprite) != (rect, image):
+                # where it was, including sprites that have gone (absorbed cubes)
+                dirty.append(rect)
+        self.drawn = drawn
+        
+        if not dirty:
+            return dirty
+        
+        for rect in dirty:
+            self.screen.blit(self.static_layer, rect, rect)
+        
+        # anything touching a repainted rect has to be drawn again, unchanged or not
+        redraw = [(s, rect) for (s, rect) in moving if rect.collidelist(dirty) != -1]
+        for sprite, rect in redraw:
+            if sprite in world.block_group:
+                self.screen.blit(sprite.image, rect)
+        for sprite, rect in redraw:
+            if sprite in world.block_group:
+                self.screen.blit(self.over_layer, rect, rect)
+        for sprite, rect in redraw:
+            if sprite not in world.block_group:
+                self.screen.blit(sprite.image, rect)
+        
+        return dirty
+
+class ArrayRenderer:
+    
+    # frame is a (height, width, 3) array of the pixels last drawn, which
+    # render() updates in place so it is never copied. size scales frames to
+    # another size, and with every only one call to render() in every draws,
+    # the others return the frame as it was.
+    
+    def __init__(self, size=None, every=1, smooth=False, bg_color=(0,0,0)):
+        import numpy
+        full = (g.width, g.height)
+        self.pixels = numpy.zeros((full[1], full[0], 4), numpy.uint8)
+        self.surface = pygame.image.frombuffer(self.pixels, full, 'RGBX')
+        self.renderer = DirtyRenderer(self.surface, bg_color)
+        
+        self.scaled = None
+        if size and tuple(size) != full:
+            self.scaled_pixels = numpy.zeros((size[1], size[0], 4), numpy.uint8)
+            self.scaled = pygame.image.frombuffer(self.scaled_pixels, tuple(size), 'RGBX')
+            self.frame = self.scaled_pixels[:, :, :3]
+        else:
+            self.frame = self.pixels[:, :, :3]
+        self.scale = smooth and pygame.transform.smoothscale or pygame.transform.scale
+        
+        self.every = every
+        self.calls = 0
+        # what the cached layers were drawn for
+        self.drawn_for = None
+    
+    def render(self, world):
+        self.calls += 1
+        if (self.calls - 1) % self.every:
+            return self.frame
+        
+        if self.drawn_for != (world, world.exit):
+            self.renderer.invalidate()
+            self.drawn_for = (world, world.exit)
+        dirty = self.renderer.draw(world)
+        if self.scaled is not None and dirty:
+            self.scale(self.surface, self.scaled.get_size(), self.scaled)
+        return self.frame
@@ -0,0 +1,208 @@
+# This is a game called "Color Cube".
+#
+# Color Cube is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Color Cube is distributed in the hope that it will be useful and maybe even fun,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Color Cube.  If not, see <http://www.gnu.org/licenses/>.
+#
+# copyright  2013 onwards Andrew Davis
+# license    http://www.gnu.org/copyleft/gpl.html GNU GPL v3 or later
+
+# Recording the keys pressed while playing and replaying them headless.
+#
+# A recording is a small binary file. After a header giving the level the
+# recording starts on and the World's dt, every record is a tick number and a
+# record type:
+#   key up or key down   followed by the key
+#   hash                 followed by World.state_hash() after that tick
+#   end                  the last record, written when the recording is closed
+# The tick is the number of World.step() calls since the recording started,
+# so key records apply before that step. A hash is written every hash_every
+# ticks and the replay checks it matches, to catch physics changing. A
+# recording without an end, from a game that crashed, replays up to its last
+# record. Recordings from before dt was recorded have CCR1 for their magic
+# and a dt of 1.
+#
+#   python -m colorcube.replay recording.ccr
+
+import struct
+
+import pygame
+from pygame.locals import *
+
+from colorcube.world import *
+
+MAGIC = 'CCR2'
+HEADER = struct.Struct('<4sHHB')  # magic, level, hash_every, dt
+MAGIC_1 = 'CCR1'
+HEADER_1 = struct.Struct('<4sHH')
+RECORD = struct.Struct('<IB')     # tick, record type
+KEY = struct.Struct('<I')
+HASH = struct.Struct('<Q')
+
+RECORD_KEY_UP = 0
+RECORD_KEY_DOWN = 1
+RECORD_HASH = 2
+RECORD_END = 3
+
+class ReplayError(Exception):
+    pass
+
+class Recorder:
+    
+    def __init__(self, path, level, hash_every=60, dt=1):
+        # dt is the recorded World's, it is replayed with the same
+        self.f = open(path, 'wb')
+        self.hash_every = hash_every
+        self.tick = 0
+        self.f.write(HEADER.pack(MAGIC, level, hash_every, dt))
+    
+    def key(self, k, down):
+        # key() and stepped() do nothing once the recording is closed
+        if not self.f:
+            return
+        kind = down and RECORD_KEY_DOWN or RECORD_KEY_UP
+        self.f.write(RECORD.pack(self.tick, kind) + KEY.pack(k))
+    
+    def stepped(self, world):
+        # call after every World.step()
+        if not self.f:
+            return
+        self.tick += 1
+        if self.tick % self.hash_every == 0:
+            self.f.write(RECORD.pack(self.tick, RECORD_HASH) + HASH.pack(world.state_hash()))
+    
+    def close(self):
+        if self.f:
+            self.f.write(RECORD.pack(self.tick, RECORD_END))
+            self.f.close()
+            self.f = None
+
+def read_recording(path):
+    # Returns (level, hash_every, dt, records) where records is a list of
+    # (tick, record type, key or hash or None).
+    f = open(path, 'rb')
+    try:
+        data = f.read()
+    finally:
+        f.close()
+    
+    if data[:4] == MAGIC and len(data) >= HEADER.size:
+        magic, level, hash_every, dt = HEADER.unpack_from(data, 0)
+        offset = HEADER.size
+    elif data[:4] == MAGIC_1 and len(data) >= HEADER_1.size:
+        magic, level, hash_every = HEADER_1.unpack_from(data, 0)
+        dt = 1
+        offset = HEADER_1.size
+    else:
+        raise ReplayError('%s is not a recording' % path)
+    
+    records = []
+    while offset < len(data):
+        tick, kind = RECORD.unpack_from(data, offset)
+        offset += RECORD.size
+        if kind == RECORD_HASH:
+            (value,) = HASH.unpack_from(data, offset)
+            offset += HASH.size
+        elif kind == RECORD_END:
+            value = None
+        else:
+            (value,) = KEY.unpack_from(data, offset)
+            offset += KEY.size
+        records.append((tick, kind, value))
+    return level, hash_every, dt, records
+
+class Replay:
+    
+    def __init__(self, path, levels=None):
+        self.level, self.hash_every, self.dt, self.records = read_recording(path)
+        self.levels = levels
+    
+    def run(self, verify=True):
+        # Play the recording back as fast as possible. Raises ReplayError at the
+        # first hash that doesn't match when verifying. Returns the World as it
+        # was at the end of the recording.
+        world = World(self.levels, dt=self.dt)
+        world.setup_level(self.level)
+        
+        self.ticks = 0
+        self.hashes_checked = 0
+        self.levels_completed = 0
+        
+        for (tick, kind, value) in self.records:
+            while self.ticks < tick:
+                if not self._step(world):
+                    return world
+            
+            if kind == RECORD_HASH:
+                if verify:
+                    actual = world.state_hash()
+                    if actual != value:
+                        raise ReplayError('state differs at tick %d, level %s: recorded %016x, replayed %016x'
+                            % (tick, world.level, value, actual))
+                    self.hashes_checked += 1
+            elif kind == RECORD_END:
+                # the game stopped here, on the last level or by quitting
+                if world.reached_exit:
+                    self.levels_completed += 1
+                return world
+            elif not self._next_level(world):
+                return world
+            elif kind == RECORD_KEY_DOWN:
+                if value == K_r:
+                    world.restart()
+                else:
+                    world.key_down(value)
+            else:
+                world.key_up(value)
+        return world
+    
+    def _step(self, world):
+        if not self._next_level(world):
+            return False
+        world.step()
+        self.ticks += 1
+        return True
+    
+    def _next_level(self, world):
+        # Like the game, a level is only left once the tick that reached its
+        # exit has been hashed, before any more keys or ticks. Returns False
+        # when there are no more levels.
+        if world.reached_exit:
+            self.levels_completed += 1
+            return world.setup_level(world.level + 1)
+        return True
+
+def main(argv):
+    import time
+    
+    if len(argv) != 2:
+        print 'usage: python -m colorcube.replay recording'
+        return 2
+    
+    replay = Replay(argv[1])
+    start = time.time()
+    try:
+        world = replay.run()
+    except ReplayError, e:
+        print 'replay failed:', e
+        return 1
+    elapsed = max(time.time() - start, 1e-6)
+    
+    print '%d ticks, %d hashes checked, %d levels completed, ended on level %s' % (
+        replay.ticks, replay.hashes_checked, replay.levels_completed, world.level)
+    print '%.0f ticks/s, %.0fx real time' % (replay.ticks / elapsed,
+        replay.ticks * replay.dt / elapsed / BASE_TICK_RATE)
+    return 0
+
+if __name__ == '__main__':
+    import sys
+    sys.exit(main(sys.argv))
@@ -0,0 +1,222 @@
+# This is a game called "Color Cube".
+#
+# Color Cube is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Color Cube is distributed in the hope that it will be useful and maybe even fun,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Color Cube.  If not, see <http://www.gnu.org/licenses/>.
+#
+# copyright  2013 onwards Andrew Davis
+# license    http://www.gnu.org/copyleft/gpl.html GNU GPL v3 or later
+
+# Finding out whether a level can be beaten by searching over what the player
+# could do.
+#
+# The player holds left, right or nothing for ticks_per_action ticks, and may
+# jump at the start. The search is breadth first over these actions, so the
+# first way found to reach the exit uses the fewest actions. States are
+# remembered after rounding positions so that a search doesn't revisit
+# states that are as good as ones already seen. States where the player can
+# no longer make the color of a barrier in front of the exit are dropped, by
+# the level's ColorTable (see colors.py).
+#
+# Rounding merges states that aren't really the same, so running out of
+# states to search doesn't prove a level can't be beaten. Only the level's
+# colors can do that: a level is unsolvable when a barrier in front of the
+# exit is a color the player can't make.
+#
+# The search steps every state on the frontier together in a BatchWorld. The
+# first few layers are searched here and then the frontier is shared out
+# between worker processes, each searching its part to the full depth.
+#
+#   python -m colorcube.solver [level ...]
+
+import multiprocessing
+import numpy
+
+from colorcube.batch import *
+
+# (direction, jump)
+ACTIONS = [(dx, jump) for dx in (-1, 0, 1) for jump in (False, True)]
+
+SOLVED = 'solved'
+UNSOLVABLE = 'unsolvable' # the colors of the barriers in front of the exit can't be made
+UNKNOWN = 'unknown'       # the search stopped at its depth or state limit, or ran out of states
+
+class SearchResult:
+    
+    def __init__(self, status, actions=None, ticks=None, states=0):
+        self.status = status
+        # a list of (direction, jump), each held for ticks_per_action ticks
+        self.actions = actions
+        # ticks from the start of the level to reaching the exit
+        self.ticks = ticks
+        self.states = states
+    
+    def __repr__(self):
+        return '<SearchResult %s ticks=%s actions=%s states=%d>' % (
+            self.status, self.ticks, self.actions and len(self.actions), self.states)
+
+def apply_actions(batch, actions):
+    # actions is an index into ACTIONS for every world in batch
+    table = numpy.array(ACTIONS, numpy.int64)
+    chosen = table[actions]
+    m = ~batch.reached_exit
+    batch.vel[m, 0, 0] = chosen[m, 0] * g.block_move
+    batch.jump(m & (chosen[:, 1] == 1))
+
+def state_keys(batch, grid=8):
+    # A key per world that is the same for worlds in much the same state.
+    first, last = batch.first_block, batch.first_barrier
+    parts = [
+        batch.pos[:, 0] // grid,
+        # every action sets the player's sideways speed, so only up and down counts
+        numpy.round(batch.vel[:, 0, 1:]).astype(numpy.int64),
+        batch.sitting_on[:, 0:1],
+        batch.color[:, 0],
+        # cubes move back and forth by themselves, only which are left matters
+        batch.alive[:, first:last].astype(numpy.int64),
+    ]
+    rows = numpy.ascontiguousarray(numpy.concatenate(parts, axis=1))
+    return [row.tostring() for row in rows]
+
+def hopeless(batch, colors):
+    # Which worlds can no longer make the color of a barrier in front of the
+    # exit they haven't got past, by the level's ColorTable.
+    strides = numpy.array([colors.strides[kind] for kind in colors.cube_kinds], numpy.int64)
+    absorbed = ~batch.alive[:, batch.first_block:batch.first_barrier]
+    states = absorbed.astype(numpy.int64).dot(strides)
+    dead = numpy.zeros(batch.count, bool)
+    for b in colors.barriers:
+        can_open = numpy.array([b in can for can in colors.can_open])
+        ahead = colors.barrier_sides[b] * (colors.barrier_x[b] - batch.pos[:, 0, 0]) > 0
+        dead |= ahead & ~can_open[states]
+    return dead
+
+def _layer(batch, paths, visited, ticks_per_action, colors=None):
+    # One layer of the search: every world in batch followed by every action.
+    # Returns (result, batch, paths) where result is set if the exit was
+    # reached, and batch and paths are the states not visited before. With a
+    # ColorTable, states that can't reach the exit any more are dropped too.
+    n = batch.count
+    rows = numpy.repeat(numpy.arange(n), len(ACTIONS))
+    actions = numpy.tile(numpy.arange(len(ACTIONS)), n)
+    expanded = batch.take(rows)
+    apply_actions(expanded, actions)
+    expanded.run(ticks_per_action)
+    
+    done = numpy.flatnonzero(expanded.reached_exit)
+    if len(done):
+        best = done[numpy.argmin(expanded.time[done])]
+        path = paths[rows[best]] + [ACTIONS[actions[best]]]
+        return SearchResult(SOLVED, path, int(expanded.time[best]), expanded.count), None, None
+    
+    dead = numpy.zeros(expanded.count, bool)
+    if colors:
+        dead = hopeless(expanded, colors)
+    keep = []
+    for i, key in enumerate(state_keys(expanded)):
+        if key not in visited and not dead[i]:
+            visited.add(key)
+            keep.append(i)
+    
+    paths = [paths[rows[i]] + [ACTIONS[actions[i]]] for i in keep]
+    batch = expanded.take(numpy.array(keep, numpy.int64))
+    return SearchResult(UNKNOWN, states=expanded.count), batch, paths
+
+def search(batch, max_depth, ticks_per_action=8, max_states=200000, visited=None, paths=None, colors=None):
+    # Breadth first search from every world in batch. paths gives the actions
+    # already taken to reach each world, colors is the level's ColorTable.
+    if visited is None:
+        visited = set()
+    if paths is None:
+        paths = [[] for i in range(batch.count)]
+    states = 0
+    
+    for depth in range(max_depth):
+        if batch.count == 0:
+            break
+        result, batch, paths = _layer(batch, paths, visited, ticks_per_action, colors)
+        states += result.states
+        if result.status == SOLVED:
+            result.states = states
+            return result
+        if len(visited) > max_states:
+            break
+    
+    return SearchResult(UNKNOWN, states=states)
+
+def _search_part(args):
+    # runs in a worker process
+    (batch, paths, max_depth, ticks_per_action, max_states, colors) = args
+    return search(batch, max_depth, ticks_per_action, max_states, paths=paths, colors=colors)
+
+def solve(level, max_depth=60, ticks_per_action=8, max_states=200000, processes=None, split_depth=2, levels=None):
+    # Search a level, using a pool of processes once the first split_depth
+    # layers have been searched. Stops as soon as any process finds the exit.
+    world = World(levels)
+    if not world.setup_level(level):
+        raise ValueError('there is no level %r' % (level,))
+    # no need to search if the colors can't be made
+    colors = world.compiled.color_table()
+    if not colors.solvable():
+        return SearchResult(UNSOLVABLE)
+    batch = BatchWorld([world])
+    
+    # the first layers, here
+    visited = set()
+    paths = [[]]
+    states = 0
+    for depth in range(min(split_depth, max_depth)):
+        result, batch, paths = _layer(batch, paths, visited, ticks_per_action, colors)
+        states += result.states
+        if result.status == SOLVED:
+            result.states = states
+            return result
+        if batch.count == 0:
+            return SearchResult(UNKNOWN, states=states)
+    
+    # the rest, shared out between processes
+    if processes is None:
+        processes = multiprocessing.cpu_count()
+    parts = min(processes * 4, batch.count)
+    jobs = []
+    for part in numpy.array_split(numpy.arange(batch.count), parts):
+        jobs.append((batch.take(part), [paths[i] for i in part],
+            max_depth - split_depth, ticks_per_action, max_states / parts + 1, colors))
+    
+    pool = multiprocessing.Pool(processes)
+    try:
+        for result in pool.imap_unordered(_search_part, jobs):
+            states += result.states
+            if result.status == SOLVED:
+                result.states = states
+                return result
+    finally:
+        pool.terminate()
+        pool.join()
+    return SearchResult(UNKNOWN, states=states)
+
+def main(argv):
+    import time
+    
+    levels = [int(a) for a in argv[1:]] or range(1, len(load_levels()) + 1)
+    for level in levels:
+        start = time.time()
+        result = solve(level)
+        print 'level %d: %s in %.1fs, %d states' % (level, result.status, time.time() - start, result.states),
+        if result.status == SOLVED:
+            print '- exit after %d ticks' % result.ticks
+        else:
+            print
+
+if __name__ == '__main__':
+    import sys
+    main(sys.argv)
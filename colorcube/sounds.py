@@ -0,0 +1,155 @@
+# This is a game called "Color Cube".
+#
+# Color Cube is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Color Cube is distributed in the hope that it will be useful and maybe even fun,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Color Cube.  If not, see <http://www.gnu.org/licenses/>.
+#
+# copyright  2013 onwards Andrew Davis
+# license    http://www.gnu.org/copyleft/gpl.html GNU GPL v3 or later
+
+# Sounds and music, loaded on a background thread.
+#
+# Decoding the sounds used to hold up the first frame, so now sound() hands
+# back a LazySound straight away and a thread loads the files while the splash
+# screen is showing. A LazySound plays nothing until its file has loaded.
+#
+# A sound that cant be loaded plays the loader's fallback instead, silence
+# unless something else is given. Missing sounds no longer stop the game.
+
+import os, threading, pygame
+
+sounds_dir = 'resources'
+
+class NoneSound:
+    def play(self): pass
+
+class LazySound:
+    
+    def __init__(self, name, loader):
+        self.name = name
+        self.sound = None
+        self.loader = loader
+        self.failed = False
+    
+    def ready(self):
+        return self.sound is not None or self.failed
+    
+    def play(self):
+        sound = self.sound
+        if sound is not None:
+            sound.play()
+        elif self.failed:
+            self.loader.fallback.play()
+
+class SoundLoader:
+    
+    def __init__(self, fallback=None):
+        # fallback is played instead of a sound that cant be loaded
+        self.fallback = fallback or NoneSound()
+        self.sounds = {}
+        self.queue = []
+        self.music_file = None
+        self.music_volume = 1.0
+        self.thread = None
+        self.lock = threading.Lock()
+    
+    def sound(self, name):
+        # The sound for a file in resources, loaded once start() is called.
+        lazy = self.sounds.get(name)
+        if lazy is None:
+            lazy = self.sounds[name] = LazySound(name, self)
+            with self.lock:
+                self.queue.append(lazy)
+        return lazy
+    
+    def music(self, name, volume=1.0):
+        # Play a file from resources as music once the sounds have loaded.
+        with self.lock:
+            self.music_file = name
+            self.music_volume = volume
+    
+    def start(self):
+        # Load everything asked for so far on a background thread, which also
+        # starts pygame's sound system if nothing else has.
+        if not pygame.mixer:
+            self._unavailable()
+            return
+        with self.lock:
+            if self.thread:
+                # still going, it will get to anything new
+                return
+            self.thread = threading.Thread(target=self._load, name='sounds')
+            # dont keep the game open if it quits while loading
+            self.thread.daemon = True
+            self.thread.start()
+    
+    def wait(self, timeout=None):
+        # Block until the background thread is done, for tools and tests.
+        thread = self.thread
+        if thread:
+            thread.join(timeout)
+    
+    def _unavailable(self):
+        print 'pygame sound not available'
+        with self.lock:
+            for lazy in self.queue:
+                lazy.failed = True
+            self.queue = []
+            self.music_file = None
+    
+    def _load(self):
+        if not pygame.mixer.get_init():
+            try:
+                pygame.mixer.init()
+            except pygame.error:
+                pass
+        if not pygame.mixer.get_init():
+            self._unavailable()
+            self.thread = None
+            return
+        while True:
+            lazy = music = None
+            with self.lock:
+                if self.queue:
+                    lazy = self.queue.pop(0)
+                elif self.music_file:
+                    music, self.music_file = self.music_file, None
+                else:
+                    self.thread = None
+                    return
+            if lazy:
+                self._load_sound(lazy)
+            else:
+                self._play_music(music, self.music_volume)
+    
+    def _load_sound(self, lazy):
+        fullname = os.path.join(sounds_dir, lazy.name)
+        try:
+            lazy.sound = pygame.mixer.Sound(fullname)
+        except (pygame.error, IOError), message:
+            print 'Cannot load sound:', fullname, message
+            lazy.failed = True
+    
+    def _play_music(self, name, volume):
+        fullname = os.path.join(sounds_dir, name)
+        try:
+            pygame.mixer.music.load(fullname)
+        except (pygame.error, IOError), message:
+            print 'Cannot load music:', fullname, message
+            return
+        pygame.mixer.music.set_volume(volume)
+        pygame.mixer.music.play()
+
+loader = SoundLoader()
+
+def sound(name):
+    return loader.sound(name)
@@ -0,0 +1,194 @@
+# This is a game called "Color Cube".
+#
+# Color Cube is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Color Cube is distributed in the hope that it will be useful and maybe even fun,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Color Cube.  If not, see <http://www.gnu.org/licenses/>.
+#
+# copyright  2013 onwards Andrew Davis
+# license    http://www.gnu.org/copyleft/gpl.html GNU GPL v3 or later
+
+# A uniform grid of sprites so collision checks only look at nearby sprites
+# instead of every sprite in a group.
+#
+# Platforms and barriers never move, so World builds a grid of them once per
+# level. Cubes do move, so World rebuilds a grid of them every tick, which is
+# still far cheaper than checking every pair.
+#
+# The sweep methods find what a sprite ran into on its way from where it was
+# to where it is, rather than only what it overlaps now, so a fast sprite
+# cant pass straight through a thin platform between two ticks.
+
+def time_of_impact(rect, delta, other, other_delta=(0, 0)):
+    # When, from 0 to 1, rect moving by delta first overlaps other moving by
+    # other_delta, or None if they dont meet. Overlapping means the same as for
+    # Rect.colliderect, touching edges dont count. A rect that starts out
+    # overlapping other and has left it by the end doesnt meet it, like it
+    # wouldnt for a check at the end of the move.
+    if rect.size[0] <= 0 or rect.size[1] <= 0 or other.size[0] <= 0 or other.size[1] <= 0:
+        return None
+    t_entry = float('-inf')
+    t_exit = float('inf')
+    for axis in (0, 1):
+        d = delta[axis] - other_delta[axis]
+        a_min = (rect.left, rect.top)[axis]
+        a_max = a_min + rect.size[axis]
+        b_min = (other.left, other.top)[axis]
+        b_max = b_min + other.size[axis]
+        if d == 0:
+            if a_max <= b_min or b_max <= a_min:
+                return None
+            continue
+        if d > 0:
+            entry = float(b_min - a_max) / d
+            exit = float(b_max - a_min) / d
+        else:
+            entry = float(b_max - a_min) / d
+            exit = float(b_min - a_max) / d
+        t_entry = max(t_entry, entry)
+        t_exit = min(t_exit, exit)
+        if t_entry >= t_exit:
+            return None
+    if t_entry < 1.0 < t_exit:
+        # still overlapping at the end
+        return max(t_entry, 0.0)
+    if 0.0 <= t_entry < 1.0:
+        # passed right through
+        return t_entry
+    return None
+
+def sweep_of(sprite):
+    # (rect before its last move, how far it moved)
+    start = sprite.previous_rect()
+    return start, (sprite.rect.left - start.left, sprite.rect.top - start.top)
+
+class Grid:
+    
+    # below this many sprites one Rect.collidelistall over all of them beats the grid
+    small = 32
+    
+    def __init__(self, sprites=(), cell_size=64):
+        self.cell_size = cell_size
+        self.build(sprites)
+    
+    def _cells(self, rect):
+        cs = self.cell_size
+        for cx in range(rect.left // cs, (rect.right - 1) // cs + 1):
+            for cy in range(rect.top // cs, (rect.bottom - 1) // cs + 1):
+                yield (cx, cy)
+    
+    def build(self, sprites):
+        # Forget everything and index sprites by their current rect.
+        # Hits are reported in the order given here, the same order the group would use.
+        self.sprites = list(sprites)
+        self.rects = [s.rect for s in self.sprites]
+        self.order = dict((s, i) for (i, s) in enumerate(self.sprites))
+        self.cells = {}
+        # how far any indexed sprite moved on its last update, so sweeps can
+        # look far enough for where it was; worked out on the first sweep
+        self.margin = None
+        if len(self.sprites) < self.small:
+            return
+        for sprite in self.sprites:
+            for cell in self._cells(sprite.rect):
+                self.cells.setdefault(cell, []).append(sprite)
+    
+    def __len__(self):
+        return len(self.sprites)
+    
+    def query(self, rect):
+        # Every indexed sprite whose rect collides with rect.
+        if not self.cells:
+            sprites = self.sprites
+            return [sprites[i] for i in rect.collidelistall(self.rects)]
+        
+        found = set()
+        for cell in self._cells(rect):
+            for sprite in self.cells.get(cell, ()):
+                if sprite not in found and rect.colliderect(sprite.rect):
+                    found.add(sprite)
+        return sorted(found, key=self.order.get)
+    
+    def _candidates(self, rect):
+        if not self.cells:
+            sprites = self.sprites
+            return [sprites[i] for i in rect.collidelistall(self.rects)]
+        found = set()
+        for cell in self._cells(rect):
+            found.update(self.cells.get(cell, ()))
+        return found
+    
+    def sweep_query(self, start, delta):
+        # Every indexed sprite that rect start ran into moving by delta, taking
+        # account of how the indexed sprites moved too, earliest first.
+        if self.margin is None:
+            self.margin = 0
+            for sprite in self.sprites:
+                other_start, other_delta = sweep_of(sprite)
+                self.margin = max(self.margin, abs(other_delta[0]), abs(other_delta[1]))
+        area = start.union(start.move(delta)).inflate(2 * self.margin, 2 * self.margin)
+        hits = []
+        for sprite in self._candidates(area):
+            other_start, other_delta = sweep_of(sprite)
+            t = time_of_impact(start, delta, other_start, other_delta)
+            if t is not None:
+                hits.append((t, self.order[sprite], sprite))
+        hits.sort()
+        return [s for (t, i, s) in hits]
+    
+    def sweep(self, s, dokill=False):
+        # Like collide() but swept along the sprite's last move.
+        start, delta = sweep_of(s)
+        hits = self.sweep_query(start, delta)
+        if dokill:
+            for sprite in hits:
+                sprite.kill()
+                self.remove(sprite)
+        return hits
+    
+    def groupsweep(self, group):
+        # Like groupcollide() but swept along each sprite's last move.
+        crashed = {}
+        for s in group:
+            start, delta = sweep_of(s)
+            hits = self.sweep_query(start, delta)
+            if hits:
+                crashed[s] = hits
+        return crashed
+    
+    def collide(self, s, dokill=False):
+        # Same result as pygame.sprite.spritecollide(s, group, dokill)
+        hits = self.query(s.rect)
+        if dokill:
+            for sprite in hits:
+                sprite.kill()
+                self.remove(sprite)
+        return hits
+    
+    def groupcollide(self, group):
+        # Same result as pygame.sprite.groupcollide(group, indexed_group, False, False)
+        crashed = {}
+        for s in group:
+            hits = self.query(s.rect)
+            if hits:
+                crashed[s] = hits
+        return crashed
+    
+    def remove(self, sprite):
+        if sprite not in self.sprites:
+            return
+        i = self.sprites.index(sprite)
+        del self.sprites[i]
+        del self.rects[i]
+        del self.order[sprite]
+        if self.cells:
+            for cell in self._cells(sprite.rect):
+                self.cells[cell].remove(sprite)
@@ -0,0 +1,409 @@
+# This is a game called "Color Cube".
+#
+# Color Cube is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Color Cube is distributed in the hope that it will be useful and maybe even fun,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Color Cube.  If not, see <http://www.gnu.org/licenses/>.
+#
+# copyright  2013 onwards Andrew Davis
+# license    http://www.gnu.org/copyleft/gpl.html GNU GPL v3 or later
+
+# The sprites that make up a level, and the settings they share.
+#
+# Levels can have thousands of sprites, so sprites are small: they use slots
+# rather than a dict, they arent pygame sprites, and they share images with
+# every other sprite that looks the same. Sprites that never move keep their
+# position as a tuple and share it with pos_previous.
+
+import os, pygame
+from pygame.locals import *
+
+import math
+
+from colorcube.images import *
+from colorcube import sounds
+
+def pos_to_top_left(pos, size):
+    return (pos[0] - (size[0]/2), pos[1] - (size[1]/2))
+
+def pos_to_rect(pos, size):
+    (x, y) = pos_to_top_left(pos, size)
+    return pygame.Rect(x, y, size[0], size[1])
+
+def color_combine(c1, c2):
+    return (c1[0]+c2[0], c1[1]+c2[1], c1[2]+c2[2])
+
+class Globals:
+    
+    def __init__(self):
+        self.width = 800
+        self.height = 600
+
+        self.level = 1
+        self.time = 0
+        
+        self.block_size = (40,40)
+        self.block_jump = -7
+        self.block_move = 3
+        self.gravity = 0.2
+        
+        self.ball_move = self.block_move * 0.25
+        
+        self.player_border_width = 4
+        self.player_start_color = (0, 0, 0)
+        
+        self.platform_thickness = 5
+        self.platform_color = (127,127,127)
+
+        self.text_antialias = 1
+        self.text_color = (200, 200, 200)
+        self.text_bg_color = (0, 0, 0)
+        
+        self.state_splash = True
+        self.state_playing = False
+        self.state_over = False
+        self.state_paused = False
+        
+        self.splash_surface = None
+        self.end_surface = None
+        self.pause_surface = None
+        # shown on the pause screen after asking for a hint
+        self.hint = None
+        self.splash_size = (600, 400)
+        
+        # only repaint the parts of the screen that change while playing
+        self.dirty_rendering = True
+        
+        # The world steps tick_rate times a second however often the screen is
+        # drawn, frame_rate 0 draws as often as possible. The game plays at the
+        # same speed at any tick_rate that divides 60, a lower one steps further
+        # each tick and draws in between the ticks. A frame that takes
+        # longer than max_ticks_per_frame ticks slows the game down rather
+        # than the game trying to catch up.
+        self.tick_rate = 60
+        self.frame_rate = 60
+        self.max_ticks_per_frame = 5
+        
+        # Nothing moves on the splash, end and pause screens, so they are only
+        # drawn when they change and the loop sleeps until there is an event,
+        # waking at least every idle_timeout ms.
+        self.idle_timeout = 500
+        
+        self.suck_sound = None
+        self.killed_sound = None
+        self.barrier_sound = None
+        self.cheer_sound = None
+    
+    def init_sound(self, fallback=None):
+        # Returns straight away, the sounds and music load in the background.
+        # fallback is played instead of any sound that cant be loaded.
+        if fallback:
+            sounds.loader.fallback = fallback
+        self.suck_sound = sounds.sound("suck.wav")
+        self.killed_sound = sounds.sound("zap.wav")
+        self.barrier_sound = sounds.sound("barrier.wav")
+        self.cheer_sound = sounds.sound("yeah.wav")
+        sounds.loader.music("music.mp3", 0.5)
+        sounds.loader.start()
+
+g = Globals()
+
+class FixedPoint(object):
+    # Fixed point physics. Velocities and gravity are ints counting 1/subpixels
+    # of a pixel instead of floats in pixels, so nothing depends on how floats
+    # round and a run is the same bit for bit in any process on any machine.
+    # Positions are whole pixels either way.
+    
+    def __init__(self, subpixels=240):
+        self.subpixels = subpixels
+        self.gravity = self.units(g.gravity)
+        self.block_jump = self.units(g.block_jump)
+        self.block_move = self.units(g.block_move)
+        self.ball_move = self.units(g.ball_move)
+    
+    def units(self, pixels):
+        units = int(round(pixels * self.subpixels))
+        if abs(units - pixels * self.subpixels) > 1e-6:
+            raise ValueError('%r is not a whole number of 1/%d pixels' % (pixels, self.subpixels))
+        return units
+    
+    def pixels(self, units):
+        return float(units) / self.subpixels
+    
+    def move(self, pos, vel, dt):
+        # the same as flooring pos + vel * dt in pixels
+        return pos + vel * dt // self.subpixels
+    
+    def fall(self, vel, dt):
+        # vel after gravity. Adding float gravity to a jump's speed ends up a
+        # hair above 0 at the top rather than on it, so the player can't jump
+        # again in mid-air. One subpixel stands in for the hair, which with the
+        # default settings never changes the pixel a move ends on.
+        vel += self.gravity * dt
+        if vel == 0:
+            vel = 1
+        return vel
+
+# Surface.blits is from pygame 1.9.4, before that sprites are blitted one by one
+has_blits = hasattr(pygame.Surface, 'blits')
+
+class SpriteGroup(object):
+    # The parts of pygame.sprite.Group the game uses. Sprites are kept in the
+    # order they were added.
+    
+    def __init__(self, sprites=()):
+        self.order = []
+        self.members = set()
+        self.add(sprites)
+    
+    def add(self, sprites):
+        for sprite in sprites:
+            if sprite not in self.members:
+                self.members.add(sprite)
+                self.order.append(sprite)
+                sprite.group = self
+    
+    def remove(self, sprite):
+        if sprite in self.members:
+            self.members.remove(sprite)
+            self.order.remove(sprite)
+            if sprite.group is self:
+                sprite.group = None
+    
+    def empty(self):
+        for sprite in self.order:
+            if sprite.group is self:
+                sprite.group = None
+        self.order = []
+        self.members = set()
+    
+    def __iter__(self):
+        return iter(self.order)
+    
+    def __len__(self):
+        return len(self.order)
+    
+    def __contains__(self, sprite):
+        return sprite in self.members
+    
+    def update(self, *args):
+        for sprite in self.order:
+            sprite.update(*args)
+    
+    def draw(self, surface):
+        if has_blits:
+            surface.blits([(sprite.image, sprite.rect) for sprite in self.order], 0)
+        else:
+            for sprite in self.order:
+                surface.blit(sprite.image, sprite.rect)
+
+class Sprite(object):
+    
+    __slots__ = ('pos', 'pos_previous', 'vel', 'color', 'size', 'sitting_on', 'image', 'rect', 'group')
+    
+    def __init__(self, pos, vel, color, size):
+        self.pos_previous = [pos[0],pos[1]]
+        self.pos = [pos[0],pos[1]]
+        self.vel = [vel[0],vel[1]]
+        self.color = color
+        self.size  = size
+        
+        self.sitting_on = False
+        
+        self.image = None
+        self.rect = pos_to_rect(self.pos, self.size)
+        # the group it was last added to, the only one cubes and the player are in
+        self.group = None
+    
+    def kill(self):
+        if self.group is not None:
+            self.group.remove(self)
+    
+    def jump(self, multiplier=1, fixed_point=None):
+        # can only jump when not already in the air
+        if self.vel[1] == 0:
+            if fixed_point:
+                self.vel[1] = fixed_point.block_jump * multiplier
+            else:
+                self.vel[1] = g.block_jump * multiplier
+            self.sitting_on = False
+    
+    def check_if_moved_off_platform(self):
+        if (self.sitting_on):
+            offleft = (self.pos[0] + self.size[0]/2) < (self.sitting_on.pos[0] - self.sitting_on.size[0]/2)
+            offright = (self.pos[0] - self.size[0]/2) > (self.sitting_on.pos[0] + self.sitting_on.size[0]/2)
+            over = (self.pos[1] + self.size[1]/2) - (self.sitting_on.pos[1] - self.sitting_on.size[1]/2)
+            
+            if offleft or offright or over != 0:
+                self.sitting_on = False
+
+    def over(self, platform):
+        was_above = (self.pos_previous[1] + self.size[1]/2) <= (platform.pos[1] - platform.size[1]/2)
+        is_above = (self.pos[1] + self.size[1]/2) <= (platform.pos[1] - platform.size[1]/2)
+        return was_above or is_above
+    
+    def revert_pos(self, stop, i):
+        self.pos = list(self.pos_previous)
+        if (stop):
+            self.vel[i] = 0
+        else:
+            self.vel[i] = -self.vel[0]
+    
+    def update_pos(self, dt=1, fixed_point=None):
+        # dt is how many ticks the step covers, vel is in fixed_point's units
+        # if there is one
+        self.pos_previous = list(self.pos)
+        
+        if fixed_point:
+            self.pos[0] = fixed_point.move(self.pos[0], self.vel[0], dt)
+            self.pos[1] = fixed_point.move(self.pos[1], self.vel[1], dt)
+        else:
+            self.pos[0] = int( math.floor( self.pos[0] + self.vel[0] * dt ) )
+            self.pos[1] = int( math.floor( self.pos[1] + self.vel[1] * dt ) )
+    
+    def gravity(self, dt=1, fixed_point=None):
+        if not self.sitting_on:
+            if fixed_point:
+                self.vel[1] = fixed_point.fall(self.vel[1], dt)
+            else:
+                self.vel[1] += g.gravity * dt
+        
+    def keep_onscreen(self, stop):
+        # stop sprites leaving the screen
+        if (self.pos[0] - self.size[0]/2) < 0:
+            self.revert_pos(stop, 0)
+        elif (self.pos[0] + self.size[0]/2) > g.width:
+            self.revert_pos(stop, 0)
+        elif (self.pos[1] - self.size[1]/2) < 0:
+            self.revert_pos(True, 1)
+        elif (self.pos[1] + self.size[1]/2) > g.height:
+            self.revert_pos(True, 1)
+        
+    def update_rect(self):
+        self.rect = pos_to_rect(self.pos, self.size)
+    
+    def previous_rect(self):
+        # where the sprite was before its last update_pos()
+        return pos_to_rect(self.pos_previous, self.size)
+
+class StaticSprite(Sprite):
+    # A sprite that never moves, one is shared by every world playing its level.
+    
+    __slots__ = ()
+    
+    def __init__(self, pos, vel, color, size):
+        self.pos = self.pos_previous = (pos[0], pos[1])
+        self.vel = (0, 0)
+        self.color = color
+        self.size = size
+        self.sitting_on = False
+        self.image = None
+        self.rect = pos_to_rect(self.pos, self.size)
+        self.group = None
+    
+    def previous_rect(self):
+        return self.rect
+
+class Platform(StaticSprite):
+    __slots__ = ()
+    
+    def __init__(self, pos, vel, color, size):
+        StaticSprite.__init__(self, pos, vel, color, size)
+        self.image = sprite_image(KIND_FILL, self.size, self.color)
+
+class Barrier(StaticSprite):
+    __slots__ = ()
+    
+    def __init__(self, pos, vel, color, size):
+        StaticSprite.__init__(self, pos, vel, color, size)
+        self.image = sprite_image(KIND_FILL, self.size, self.color)
+        
+class Exit(StaticSprite):
+    __slots__ = ()
+    
+    def __init__(self, pos, vel, color, size):
+        StaticSprite.__init__(self, pos, vel, color, size)
+        # always labelled, levels are compiled once so the image is kept
+        self.image = sprite_image(KIND_EXIT, self.size, self.color)
+    
+class Block(Sprite):
+    __slots__ = ()
+    
+    def __init__(self, pos, vel, color, size):
+        Sprite.__init__(self, pos, vel, color, size)
+        self.image = sprite_image(KIND_FILL, self.size, self.color)
+    
+    def update(self, dt=1, fixed_point=None):
+        Sprite.update_pos(self, dt, fixed_point)
+        Sprite.keep_onscreen(self, False)
+        
+        # Blocks shouldn't run off the end of platforms
+        if self.sitting_on:
+            if (self.pos[0] + self.size[0]/2 > self.sitting_on.pos[0] + self.sitting_on.size[0]/2
+            or self.pos[0] - self.size[0]/2 < self.sitting_on.pos[0] - self.sitting_on.size[0]/2):
+                self.vel[0] *= -1
+        
+        Sprite.update_rect(self)
+    
+class Player(Sprite):
+    __slots__ = ('image_color',)
+    
+    def __init__(self, pos, vel, color, size):
+        Sprite.__init__(self, pos, vel, color, size)
+        self.image = sprite_image(KIND_PLAYER, self.size, self.color, g.player_border_width)
+        self.image_color = self.color
+    
+    def update(self, dt=1, fixed_point=None):
+        Sprite.update_pos(self, dt, fixed_point)
+        Sprite.gravity(self, dt, fixed_point)
+        Sprite.keep_onscreen(self, True)
+        Sprite.check_if_moved_off_platform(self)
+        
+        # the image only changes when the player's color does
+        if self.image_color != self.color:
+            self.image = sprite_image(KIND_PLAYER, self.size, self.color, g.player_border_width)
+            self.image_color = self.color
+        
+        Sprite.update_rect(self)
+        
+class Ball(Sprite):
+    __slots__ = ()
+    
+    def __init__(self, pos, vel, color, radius):
+        Sprite.__init__(self, pos, vel, color, (radius,radius))
+        self.image = sprite_image(KIND_BALL, self.size, self.color)
+    
+    def update(self, target, dt=1, fixed_point=None):
+        Sprite.update_pos(self, dt, fixed_point)
+        Sprite.gravity(self, dt, fixed_point)
+        Sprite.keep_onscreen(self, False)
+        Sprite.check_if_moved_off_platform(self)
+        
+        ball_move = g.ball_move
+        if fixed_point:
+            ball_move = fixed_point.ball_move
+        
+        # only let the ball change direction when it bounces
+        if self.vel[1] == 0:
+            if (target.pos[0] < self.pos[0]):
+                self.vel[0] = -ball_move
+            else:
+                self.vel[0] = ball_move
+        
+        if (target.pos[1] < self.pos[1]):
+            Sprite.jump(self, 1, fixed_point)
+        
+        Sprite.update_rect(self)
+
+def sprite_on_platform(sprite, platform):
+    sprite.sitting_on = platform
+    sprite.vel[1] = 0
+    sprite.pos[1] = platform.pos[1] - platform.size[1]/2 - sprite.size[1]/2
@@ -0,0 +1,321 @@
+# This is a game called "Color Cube".
+#
+# Color Cube is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Color Cube is distributed in the hope that it will be useful and maybe even fun,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Color Cube.  If not, see <http://www.gnu.org/licenses/>.
+#
+# copyright  2013 onwards Andrew Davis
+# license    http://www.gnu.org/copyleft/gpl.html GNU GPL v3 or later
+
+# Scoring players over many levels at once.
+#
+# A job is one playthrough of one level, from the game's levels or a level
+# pack file, by either a recording made with --record (see replay.py) or a
+# policy. A policy is named "module:function". The function is called with the
+# job's seed at the start of the run and returns a function that is given the
+# World before every tick and returns the keys to hold down.
+#
+# Jobs are shared out between a pool of processes. Each keeps a World for
+# every level pack it has played, so a run costs a restart rather than a new
+# game. Every result is written as a line of JSON as soon as it comes in. A
+# results file cut short can be carried on with: jobs that already have a
+# result are skipped.
+#
+#   python -m colorcube.tournament results.jsonl --policy colorcube.tournament:wander --seeds 100
+#   python -m colorcube.tournament results.jsonl --script a.ccr --script b.ccr --levels 1-8
+#   python -m colorcube.tournament results.jsonl --jobs jobs.jsonl
+#
+# A job in a jobs file has a level, a script or a policy, and optionally a
+# pack, a seed and an id. The id is made from the rest if it isn't given and
+# is what resuming goes by.
+
+import os, sys, json, random
+
+from colorcube.world import *
+from colorcube.levels import load_levels, levels_path
+from colorcube.replay import read_recording, RECORD_KEY_DOWN, RECORD_KEY_UP, RECORD_END
+
+def wander(seed):
+    # A policy that holds a random arrow, space or nothing for 20 ticks at a time.
+    rnd = random.Random(seed)
+    held = []
+    def keys(world):
+        if world.time % 20 == 0:
+            k = rnd.choice([K_LEFT, K_RIGHT, K_SPACE, None])
+            held[:] = k and [k] or []
+        return held
+    return keys
+
+def policy_function(name):
+    (module, function) = name.split(':')
+    __import__(module)
+    return getattr(sys.modules[module], function)
+
+def policy_player(keys):
+    # Turns a policy's keys into key presses. Returns None so play() carries on.
+    held = []
+    def act(world, tick):
+        want = sorted(set(keys(world)))
+        for k in held:
+            if k not in want:
+                world.key_up(k)
+        for k in want:
+            if k not in held:
+                world.key_down(k)
+        held[:] = want
+    return act
+
+def script_player(records):
+    # Presses the keys in a recording at the ticks they were pressed at.
+    # Returns False at the tick the recording ended, which ends the run. A
+    # recording without an end carries on with the last keys held.
+    position = [0]
+    def act(world, tick):
+        i = position[0]
+        while i < len(records) and records[i][0] <= tick:
+            (t, kind, value) = records[i]
+            if kind == RECORD_END:
+                return False
+            if kind == RECORD_KEY_DOWN:
+                if value == K_r:
+                    world.restart()
+                else:
+                    world.key_down(value)
+            elif kind == RECORD_KEY_UP:
+                world.key_up(value)
+            i += 1
+        position[0] = i
+    return act
+
+def play(world, level, act, max_ticks=3000):
+    # Play level until the exit, max_ticks or act() returning False. act is
+    # called with the world and the ticks so far before every tick. When act
+    # restarts the level the counts start again, so they are all for the
+    # last attempt; max_ticks is over all of them.
+    if level == world.level and world.start:
+        world.restart()
+    elif not world.setup_level(level):
+        raise ValueError('there is no level %r' % (level,))
+    
+    steps = 0
+    restarts = 0
+    ticks = 0
+    absorbed = 0
+    bounces = 0
+    while steps < max_ticks and not world.reached_exit:
+        if act(world, steps) is False:
+            break
+        if steps and world.time == 0:
+            restarts += 1
+            ticks = 0
+            absorbed = 0
+            bounces = 0
+        for event in world.step():
+            if event == EVENT_ABSORB:
+                absorbed += 1
+            elif event == EVENT_BARRIER:
+                bounces += 1
+        ticks += 1
+        steps += 1
+    
+    return {
+        'reached_exit': world.reached_exit,
+        'ticks': ticks,
+        'restarts': restarts,
+        'absorbed': absorbed,
+        'color': list(world.player_block.color),
+        'barrier_bounces': bounces,
+        'hash': '%016x' % world.state_hash(),
+    }
+
+def job_id(job):
+    if 'id' in job:
+        return job['id']
+    return '%s/%s/%s/%s' % (job.get('pack') or 'levels', job.get('level') or 'recorded',
+        job.get('script') or job.get('policy'), job.get('seed', 0))
+
+# Kept by each process between jobs: a World for every level pack and dt, and
+# the recordings and policies read so far.
+worlds = {}
+scripts = {}
+policies = {}
+
+def run_job(job, max_ticks=3000, fixed_point=False):
+    # Play one job in this process and return its result. Recordings are
+    # played with the dt they were recorded with.
+    level = job.get('level')
+    dt = 1
+    if job.get('script'):
+        path = job['script']
+        if path not in scripts:
+            scripts[path] = read_recording(path)
+        (recorded_level, hash_every, dt, records) = scripts[path]
+        level = level or recorded_level
+        act = script_player(records)
+    else:
+        name = job['policy']
+        if name not in policies:
+            policies[name] = policy_function(name)
+        act = policy_player(policies[name](job.get('seed', 0)))
+    
+    pack = job.get('pack')
+    world = worlds.get((pack, fixed_point, dt))
+    if world is None:
+        world = World(pack and load_levels(pack), dt=dt, fixed_point=fixed_point)
+        worlds[(pack, fixed_point, dt)] = world
+    
+    result = play(world, level, act, max_ticks)
+    result['id'] = job_id(job)
+    result['level'] = level
+    for key in ('pack', 'script', 'policy', 'seed'):
+        if key in job:
+            result[key] = job[key]
+    return result
+
+def _run_job(args):
+    # runs in a worker process
+    (job, max_ticks, fixed_point) = args
+    return run_job(job, max_ticks, fixed_point)
+
+def finished_ids(path):
+    # The ids of the jobs with a result in path. A last line that was only
+    # partly written is cut off.
+    done = set()
+    if not os.path.exists(path):
+        return done
+    f = open(path, 'rb+')
+    try:
+        good = 0
+        for line in f:
+            if not line.endswith('\n'):
+                break
+            try:
+                done.add(json.loads(line)['id'])
+            except ValueError:
+                break
+            good += len(line)
+        f.truncate(good)
+    finally:
+        f.close()
+    return done
+
+def run_tournament(jobs, path, processes=None, max_ticks=3000, fixed_point=False, resume=True):
+    # Play jobs in a pool of processes, appending each result to path as it
+    # comes in. With resume, jobs that already have a result in path are
+    # skipped. Returns the number of jobs played.
+    import multiprocessing
+    done = set()
+    if resume:
+        done = finished_ids(path)
+    else:
+        open(path, 'w').close()
+    todo = [(job, max_ticks, fixed_point) for job in jobs if job_id(job) not in done]
+    
+    pool = None
+    out = open(path, 'ab')
+    try:
+        if processes == 1:
+            results = (_run_job(args) for args in todo)
+        else:
+            if processes is None:
+                processes = multiprocessing.cpu_count()
+            pool = multiprocessing.Pool(processes)
+            # big enough chunks that handing out jobs costs little, small
+            # enough that every process is busy until the end
+            chunk = max(1, min(256, len(todo) / (processes * 16)))
+            results = pool.imap_unordered(_run_job, todo, chunk)
+        for result in results:
+            out.write(json.dumps(result, sort_keys=True) + '\n')
+            out.flush()
+    finally:
+        out.close()
+        if pool:
+            pool.terminate()
+            pool.join()
+    return len(todo)
+
+def parse_levels(text):
+    # "1-8,10" is levels 1 to 8 and 10
+    levels = []
+    for part in text.split(','):
+        if '-' in part:
+            (first, last) = part.split('-')
+            levels += range(int(first), int(last) + 1)
+        else:
+            levels.append(int(part))
+    return levels
+
+def make_jobs(levels=None, packs=(None,), scripts=(), policies=(), seeds=1):
+    # Every level of every pack played by every script and every policy with
+    # every seed. Scripts play the level they were recorded on unless levels
+    # are given, and without levels policies play all of a pack's levels.
+    jobs = []
+    for pack in packs:
+        pack_levels = levels or range(1, len(load_levels(pack or levels_path)) + 1)
+        for script in scripts:
+            for level in levels or [None]:
+                job = {'script': script}
+                if level:
+                    job['level'] = level
+                if pack:
+                    job['pack'] = pack
+                jobs.append(job)
+        for policy in policies:
+            for level in pack_levels:
+                for seed in range(seeds):
+                    job = {'policy': policy, 'level': level, 'seed': seed}
+                    if pack:
+                        job['pack'] = pack
+                    jobs.append(job)
+    return jobs
+
+def main(argv):
+    import time
+    from optparse import OptionParser
+    parser = OptionParser(usage='%prog results.jsonl [options]')
+    parser.add_option('--jobs', metavar='FILE', help='play the jobs in FILE, one JSON object a line')
+    parser.add_option('--levels', help='the levels to play, like 1-8,10')
+    parser.add_option('--pack', action='append', metavar='FILE', help='play levels from this level pack as well as the game\'s, can be given more than once')
+    parser.add_option('--script', action='append', default=[], metavar='FILE', help='a recording to play, can be given more than once')
+    parser.add_option('--policy', action='append', default=[], metavar='MODULE:FUNCTION', help='a policy to play, can be given more than once')
+    parser.add_option('--seeds', type='int', default=1, help='how many seeds to play each policy with')
+    parser.add_option('--max-ticks', type='int', default=3000, help='give up on a run after this many ticks')
+    parser.add_option('--fixed-point', action='store_true', help='use fixed point physics, for results that are the same on any machine')
+    parser.add_option('--processes', type='int', help='worker processes, all the cpus by default')
+    parser.add_option('--restart', action='store_true', help='start the results again rather than carrying on')
+    (options, args) = parser.parse_args(argv[1:])
+    if len(args) != 1:
+        parser.error('where should the results go?')
+    
+    if options.jobs:
+        f = open(options.jobs)
+        try:
+            jobs = [json.loads(line) for line in f if line.strip()]
+        finally:
+            f.close()
+    else:
+        if not options.script and not options.policy:
+            parser.error('give a --script or a --policy to play')
+        levels = options.levels and parse_levels(options.levels)
+        packs = [None] + (options.pack or [])
+        jobs = make_jobs(levels, packs, options.script, options.policy, options.seeds)
+    
+    start = time.time()
+    played = run_tournament(jobs, args[0], options.processes, options.max_ticks,
+        options.fixed_point, not options.restart)
+    elapsed = max(time.time() - start, 1e-6)
+    print '%d jobs, %d played, %d already had results, %.0f runs/s' % (
+        len(jobs), played, len(jobs) - played, played / elapsed)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
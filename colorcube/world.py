@@ -0,0 +1,406 @@
+# This is a game called "Color Cube".
+#
+# Color Cube is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Color Cube is distributed in the hope that it will be useful and maybe even fun,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Color Cube.  If not, see <http://www.gnu.org/licenses/>.
+#
+# copyright  2013 onwards Andrew Davis
+# license    http://www.gnu.org/copyleft/gpl.html GNU GPL v3 or later
+
+# The game world: levels and the simulation step.
+# Nothing in here needs a window, so a World can be stepped headless
+# as fast as the CPU allows.
+
+import pygame
+from pygame.locals import *
+
+import hashlib, struct
+
+from colorcube.sprites import *
+from colorcube.spatial import Grid, sweep_of, time_of_impact
+from colorcube.levels import load_levels
+
+# Things that happen during a step which the front end may want to react to,
+# for example by playing a sound.
+EVENT_ABSORB = 'absorb'
+EVENT_BARRIER = 'barrier'
+EVENT_EXIT = 'exit'
+
+# The speeds in the levels are per tick at 60 ticks a second. Fewer ticks a
+# second means each tick covers more of them.
+BASE_TICK_RATE = 60
+
+def step_size(tick_rate):
+    # The dt for stepping tick_rate times a second, which has to divide 60.
+    if tick_rate <= 0 or BASE_TICK_RATE % tick_rate:
+        raise ValueError('the tick rate has to divide %d, not %r' % (BASE_TICK_RATE, tick_rate))
+    return BASE_TICK_RATE // tick_rate
+
+# A snapshot is one struct: level, time, reached_exit and the number of cubes,
+# then the player and its color, then each cube the level started with and
+# whether it is still there. A sprite is its pos, pos_previous, vel, the top
+# left of its rect, the number of the platform it is on or -1, and which parts
+# of vel are ints, as they come back the same type they were.
+SNAPSHOT_HEADER = struct.Struct('<iqBI')
+SNAPSHOT_SPRITE = 'iiiiddiiiB'
+snapshot_formats = {}
+
+def snapshot_format(cubes):
+    format = snapshot_formats.get(cubes)
+    if format is None:
+        format = struct.Struct(SNAPSHOT_HEADER.format + SNAPSHOT_SPRITE + 'iii' + ('B' + SNAPSHOT_SPRITE) * cubes)
+        snapshot_formats[cubes] = format
+    return format
+
+class World:
+    # One playthrough of one level. step() advances the simulation by a single
+    # tick with no frame cap; main() calls it once per frame.
+    
+    def __init__(self, levels=None, dt=1, swept=None, fixed_point=False):
+        # levels is a LevelPack, by default the levels that come with the game.
+        # Each step covers dt ticks. With swept collisions sprites collide with
+        # any platform, barrier or exit they passed through during a step, not
+        # only what they end up overlapping, which keeps fast sprites and big
+        # steps from going through them. Cubes are still only absorbed where
+        # they end up, so at a dt of 1 swept runs are the same as others.
+        # Collisions are swept by default when a step covers more than a tick.
+        # fixed_point is True or a FixedPoint to keep velocities as ints in its
+        # units, so runs are bit for bit the same everywhere; they stay within
+        # a pixel of float runs.
+        if levels is None:
+            levels = load_levels()
+        self.levels = levels
+        self.dt = dt
+        if swept is None:
+            swept = dt > 1
+        self.swept = swept
+        if fixed_point is True:
+            fixed_point = FixedPoint()
+        self.fixed_point = fixed_point or None
+        
+        self.level = None
+        self.time = 0
+        self.reached_exit = False
+        
+        self.player_block = None
+        self.exit = None
+        self.ball = None
+        
+        self.compiled = None
+        # every cube the level started with, absorbed or not, and the state
+        # the level started in
+        self.cubes = []
+        self.start = None
+        
+        self.block_group = SpriteGroup()
+        self.platform_group = SpriteGroup()
+        self.barrier_group = SpriteGroup()
+        
+        # platforms and barriers dont move so are indexed once per level,
+        # blocks are indexed again every tick
+        self.platform_index = Grid()
+        self.barrier_index = Grid()
+        self.block_index = Grid()
+    
+    def setup_level(self, level):
+        # Returns False if there is no such level.
+        self.block_group.empty()
+        self.platform_group.empty()
+        self.barrier_group.empty()
+        
+        self.level = level
+        self.time = 0
+        self.reached_exit = False
+        self.player_block = None
+        self.exit = None
+        self.ball = None
+        self.cubes = []
+        self.start = None
+        
+        compiled = self.levels.get(level)
+        self.compiled = compiled
+        if not compiled:
+            self.platform_index = Grid()
+            self.barrier_index = Grid()
+            return False
+        
+        # the compiled level's exit, platforms and barriers are shared, they never change
+        self.exit = compiled.exit
+        self.platform_group.add(compiled.platforms)
+        self.barrier_group.add(compiled.barriers)
+        self.platform_index = compiled.platform_index
+        self.barrier_index = compiled.barrier_index
+        
+        self.cubes = compiled.make_blocks()
+        self.block_group.add(self.cubes)
+        self.player_block = compiled.make_player()
+        
+        fixed_point = self.fixed_point
+        if fixed_point:
+            for s in self.cubes + [self.player_block]:
+                s.vel = [fixed_point.units(v) for v in s.vel]
+        
+        self.start = self.snapshot()
+        return True
+    
+    def restart(self):
+        # Back to the start of the level, reusing every sprite.
+        self.restore(self.start)
+    
+    def _sprite_values(self, s):
+        on = -1
+        if s.sitting_on:
+            on = self.compiled.platform_numbers[s.sitting_on]
+        ints = (type(s.vel[0]) is int) | (type(s.vel[1]) is int) << 1
+        return [s.pos[0], s.pos[1], s.pos_previous[0], s.pos_previous[1], s.vel[0], s.vel[1], s.rect.x, s.rect.y, on, ints]
+    
+    def _restore_sprite(self, s, values, i):
+        s.pos[0], s.pos[1], s.pos_previous[0], s.pos_previous[1], vx, vy, s.rect.x, s.rect.y, on, ints = values[i:i + 10]
+        if ints & 1:
+            vx = int(vx)
+        if ints & 2:
+            vy = int(vy)
+        s.vel[0] = vx
+        s.vel[1] = vy
+        s.sitting_on = on >= 0 and self.compiled.platforms[on]
+    
+    def snapshot(self):
+        # Everything about the level that changes as it is played, as a string
+        # for restore(). The ball, which no level has, isnt included.
+        player = self.player_block
+        values = [self.level, self.time, self.reached_exit, len(self.cubes)]
+        values += self._sprite_values(player)
+        values += player.color
+        for cube in self.cubes:
+            values.append(cube in self.block_group)
+            values += self._sprite_values(cube)
+        return snapshot_format(len(self.cubes)).pack(*values)
+    
+    def restore(self, snapshot):
+        # Put back the state from snapshot(). Only moves the sprites there
+        # already are unless the snapshot is of another level.
+        (level, time, reached_exit, cubes) = SNAPSHOT_HEADER.unpack_from(snapshot)
+        if level != self.level or not self.compiled or cubes != len(self.cubes):
+            if not self.setup_level(level):
+                raise ValueError('there is no level %r' % (level,))
+        values = snapshot_format(cubes).unpack(snapshot)
+        self.time = time
+        self.reached_exit = bool(reached_exit)
+        
+        player = self.player_block
+        # past the header
+        i = 4
+        self._restore_sprite(player, values, i)
+        player.color = values[i + 10:i + 13]
+        if player.image_color != player.color:
+            player.image = sprite_image(KIND_PLAYER, player.size, player.color, g.player_border_width)
+            player.image_color = player.color
+        i += 13
+        
+        alive = []
+        for cube in self.cubes:
+            if values[i]:
+                alive.append(cube)
+            self._restore_sprite(cube, values, i + 1)
+            i += 11
+        if alive != self.block_group.order:
+            self.block_group.empty()
+            self.block_group.add(alive)
+    
+    def block_move(self):
+        # how fast the player moves sideways, in the units vel is in
+        if self.fixed_point:
+            return self.fixed_point.block_move
+        return g.block_move
+    
+    def key_down(self, k):
+        player_block = self.player_block
+        if k == K_LEFT and player_block:
+            player_block.vel[0] -= self.block_move()
+        elif k == K_RIGHT and player_block:
+            player_block.vel[0] += self.block_move()
+        elif k == K_SPACE and player_block:
+            player_block.jump(1, self.fixed_point)
+
+    def key_up(self, k):
+        player_block = self.player_block
+        if k == K_LEFT and player_block:
+            player_block.vel[0] += self.block_move()
+            if (player_block.vel[0] > 0):
+                player_block.vel[0] = 0
+        elif k == K_RIGHT and player_block:
+            player_block.vel[0] -= self.block_move()
+            if (player_block.vel[0] < 0):
+                player_block.vel[0] = 0
+    
+    def step(self, profiler=None):
+        # Advance the world by one tick. Returns a list of the EVENT_* that happened.
+        # A profiler's begin() and end() are called around every phase.
+        events = []
+        if self.reached_exit:
+            return events
+        
+        self.time += self.dt
+        
+        if profiler is None:
+            for name, phase in self.phases:
+                phase(self, events)
+        else:
+            for name, phase in self.phases:
+                profiler.begin(name)
+                phase(self, events)
+                profiler.end(name)
+        
+        return events
+    
+    def update_blocks(self, events):
+        #exit, platforms and barriers dont move so dont have to call update()
+        self.block_group.update(self.dt, self.fixed_point)
+        
+        ball = self.ball
+        if ball:
+            ball.update(self.player_block, self.dt, self.fixed_point)
+            
+            # Did the ball touch a platform?
+            hits = self.collide(self.platform_index, ball)
+            if ( len(hits) > 0):
+                for platform in hits:
+                    if ball.over(platform):
+                        # swept hits come earliest first, so this is the one it landed on
+                        sprite_on_platform(ball, platform)
+                        break
+    
+    def collide_blocks_platforms(self, events):
+        # Are any blocks on a platform?
+        hits = self.groupcollide(self.platform_index, self.block_group)
+        if ( len(hits) > 0):
+            for block in hits:
+                platform = hits[block][0]
+                if block.sitting_on != platform:
+                    if block.pos[1] < platform.pos[1]:
+                        sprite_on_platform(block, platform)
+    
+    def collide_blocks_barriers(self, events):
+        # Have any blocks hit a barrier?
+        hits = self.groupcollide(self.barrier_index, self.block_group)
+        if ( len(hits) > 0):
+            for block in hits:
+                barrier = hits[block][0]
+                if block.color != barrier.color:
+                    # block cannot pass through
+                    block.vel[0] *= -1
+                    block.pos[0] = barrier.pos[0] - barrier.size[0]/2 - block.size[0]/2
+    
+    def update_player(self, events):
+        if self.player_block:
+            self.player_block.update(self.dt, self.fixed_point)
+    
+    def absorb_blocks(self, events):
+        player_block = self.player_block
+        if player_block:
+            # Did the player touch a block? Only where they both end up, even
+            # when swept, as sweeping two moving sprites finds blocks that
+            # only clipped the player partway through a tick
+            self.block_index.build(self.block_group)
+            hits = self.block_index.collide(player_block, True)
+            for block in hits:
+                events.append(EVENT_ABSORB)
+                if player_block.color == g.player_start_color:
+                    player_block.color = block.color
+                else:
+                    player_block.color = color_combine(player_block.color, block.color)
+    
+    def collide_player_platforms(self, events):
+        player_block = self.player_block
+        if player_block:
+            # Did the player touch a platform?
+            hits = self.collide(self.platform_index, player_block)
+            if ( len(hits) > 0):
+                for platform in hits:
+                    if player_block.over(platform):
+                        # swept hits come earliest first, so this is the one it landed on
+                        sprite_on_platform(player_block, platform)
+                        break
+    
+    def collide_player_barriers(self, events):
+        player_block = self.player_block
+        if player_block:
+            # Did the player touch a barrier?
+            hits = self.collide(self.barrier_index, player_block)
+            if ( len(hits) > 0):
+                for barrier in hits:
+                    if player_block.color != barrier.color:
+                        # player cannot pass through
+                        events.append(EVENT_BARRIER)
+                        player_block.vel[0] = 0
+                        player_block.pos[0] = barrier.pos[0] - barrier.size[0]/2 - player_block.size[0]/2
+    
+    def check_exit(self, events):
+        player_block = self.player_block
+        # Has the player reached the exit?
+        if player_block and self.touching(player_block, self.exit):
+            # player has reached the exit
+            events.append(EVENT_EXIT)
+            self.reached_exit = True
+    
+    def collide(self, index, s, dokill=False):
+        if self.swept:
+            return index.sweep(s, dokill)
+        return index.collide(s, dokill)
+    
+    def groupcollide(self, index, group):
+        if self.swept:
+            return index.groupsweep(group)
+        return index.groupcollide(group)
+    
+    def touching(self, s, other):
+        if self.swept:
+            start, delta = sweep_of(s)
+            return time_of_impact(start, delta, other.rect) is not None
+        return s.rect.colliderect(other.rect)
+    
+    # The phases of a tick, in order, named for profiling.
+    phases = [
+        ('update', update_blocks),
+        ('platforms', collide_blocks_platforms),
+        ('barriers', collide_blocks_barriers),
+        ('update', update_player),
+        ('absorb', absorb_blocks),
+        ('platforms', collide_player_platforms),
+        ('barriers', collide_player_barriers),
+        ('exit', check_exit),
+    ]
+    
+    def state_hash(self):
+        # A 64 bit hash of everything that affects what happens next. Cubes are
+        # hashed in a fixed order as group order is not the same between runs.
+        def sprite_state(s):
+            on = s.sitting_on and (tuple(s.sitting_on.pos), tuple(s.sitting_on.size))
+            return (tuple(s.pos), tuple(s.pos_previous), tuple(s.vel), s.color, on)
+        state = [self.level, self.time, self.reached_exit]
+        for s in (self.player_block, self.ball):
+            state.append(s and sprite_state(s))
+        state.append(sorted(sprite_state(s) for s in self.block_group))
+        if self.fixed_point:
+            # so fixed and float states never hash the same
+            state.append(self.fixed_point.subpixels)
+        digest = hashlib.md5(repr(state)).digest()
+        return struct.unpack('<Q', digest[:8])[0]
+    
+    def run(self, ticks):
+        # Step up to ticks times, stopping early at the exit. Returns the
+        # number of ticks actually run.
+        for i in xrange(ticks):
+            if self.reached_exit:
+                return i
+            self.step()
+        return ticks
@@ -1,8 +1,8 @@
 from cx_Freeze import setup,Executable
 
-includefiles = ['resources/suck.wav','resources/zap.wav','resources/barrier.wav','resources/yeah.wav','resources/music.mp3']
+includefiles = ['resources/suck.wav','resources/zap.wav','resources/barrier.wav','resources/yeah.wav','resources/levels.json','resources/music.mp3']
 
-build_exe_options = {"packages": ["os"], "excludes": ["tkinter"], 'include_files':includefiles}
+build_exe_options = {"packages": ["os", "colorcube"], "excludes": ["tkinter"], 'include_files':includefiles}
 
 setup(
     name = 'ColorCube',
@@ -0,0 +1,50 @@
+# This is a game called "Color Cube".
+#
+# Color Cube is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Color Cube is distributed in the hope that it will be useful and maybe even fun,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Color Cube.  If not, see <http://www.gnu.org/licenses/>.
+#
+# copyright  2013 onwards Andrew Davis
+# license    http://www.gnu.org/copyleft/gpl.html GNU GPL v3 or later
+
+# Random key presses for the tests, the same for a seed everywhere.
+
+import random
+
+from pygame.locals import *
+
+def random_keys(seed, ticks=3000, chance=0.15):
+    # For each tick, the (key, down) to press or let go of before it, or
+    # None. Keys are pressed and let go at random ticks, so there are jump
+    # presses at every point of a jump, the top included.
+    rnd = random.Random(seed)
+    held = set()
+    for t in xrange(ticks):
+        if rnd.random() < chance:
+            k = rnd.choice([K_LEFT, K_RIGHT, K_SPACE])
+            if k in held:
+                held.remove(k)
+                yield (k, False)
+            else:
+                held.add(k)
+                yield (k, True)
+        else:
+            yield None
+
+def press(world, key):
+    # a key from random_keys, on a World
+    if key:
+        (k, down) = key
+        if down:
+            world.key_down(k)
+        else:
+            world.key_up(k)
@@ -0,0 +1,77 @@
+# This is a game called "Color Cube".
+#
+# Color Cube is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Color Cube is distributed in the hope that it will be useful and maybe even fun,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Color Cube.  If not, see <http://www.gnu.org/licenses/>.
+#
+# copyright  2013 onwards Andrew Davis
+# license    http://www.gnu.org/copyleft/gpl.html GNU GPL v3 or later
+
+# BatchWorld against World, run from the top of the repository:
+#
+#   python -m unittest discover tests
+
+import os, unittest
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+from colorcube.batch import *
+from keys import random_keys, press
+
+RUNS = [(level, seed) for level in range(1, 9) for seed in range(3)]
+
+def world_state(world):
+    player = world.player_block
+    cubes = sorted((tuple(cube.pos), cube.color) for cube in world.block_group)
+    return (tuple(player.pos), tuple(float(v) for v in player.vel), player.color, cubes)
+
+def batch_state(batch, i):
+    cubes = sorted((tuple(int(v) for v in batch.pos[i, j]), tuple(int(v) for v in batch.color[i, j]))
+        for j in range(batch.first_block, batch.first_barrier) if batch.alive[i, j])
+    return (tuple(int(v) for v in batch.pos[i, 0]), tuple(float(v) for v in batch.vel[i, 0]),
+        tuple(int(v) for v in batch.color[i, 0]), cubes)
+
+class BatchTest(unittest.TestCase):
+    
+    def test_same_as_world(self):
+        # every world of the batch against a World given the same keys, every tick
+        worlds = []
+        for (level, seed) in RUNS:
+            world = World()
+            world.setup_level(level)
+            worlds.append(world)
+        batch = BatchWorld.from_levels([level for (level, seed) in RUNS])
+        keys = [random_keys(seed) for (level, seed) in RUNS]
+        
+        playing = range(len(RUNS))
+        for t in range(3000):
+            for i in playing:
+                world = worlds[i]
+                key = next(keys[i])
+                press(world, key)
+                if key:
+                    (k, down) = key
+                    if down:
+                        batch.key_down(k, [i])
+                    else:
+                        batch.key_up(k, [i])
+                world.step()
+            batch.step()
+            for i in playing:
+                world = worlds[i]
+                self.assertEqual(world_state(world), batch_state(batch, i), 'level %d seed %d tick %d' % (RUNS[i] + (t,)))
+                self.assertEqual(world.reached_exit, batch.reached_exit[i])
+            playing = [i for i in playing if not worlds[i].reached_exit]
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+# This is a game called "Color Cube".
+#
+# Color Cube is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Color Cube is distributed in the hope that it will be useful and maybe even fun,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Color Cube.  If not, see <http://www.gnu.org/licenses/>.
+#
+# copyright  2013 onwards Andrew Davis
+# license    http://www.gnu.org/copyleft/gpl.html GNU GPL v3 or later
+
+# The single and vectorised environments against each other, run from the
+# top of the repository:
+#
+#   python -m unittest discover tests
+
+import os, unittest
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+from colorcube.env import *
+from colorcube.solver import SOLVED, search
+
+class EnvTest(unittest.TestCase):
+    
+    def test_same_rewards_to_the_exit(self):
+        # the exit is reached partway through the last action
+        world = World()
+        world.setup_level(1)
+        result = search(BatchWorld([world]), 60, 8)
+        self.assertEqual(result.status, SOLVED)
+        self.assertTrue(result.ticks % 8)
+        
+        env = Env(ticks_per_action=8)
+        vec = VecEnv([1], ticks_per_action=8)
+        env.reset(1)
+        vec.reset()
+        for i, action in enumerate(result.actions):
+            a = ACTIONS.index(action)
+            (obs, reward, done, info) = env.step(a)
+            (vec_obs, vec_rewards, vec_dones, vec_info) = vec.step([a])
+            self.assertAlmostEqual(reward, vec_rewards[0], 6, 'action %d' % i)
+            self.assertEqual(done, vec_dones[0])
+        self.assertTrue(done)
+        self.assertTrue(env.world.reached_exit)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+# This is a game called "Color Cube".
+#
+# Color Cube is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Color Cube is distributed in the hope that it will be useful and maybe even fun,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Color Cube.  If not, see <http://www.gnu.org/licenses/>.
+#
+# copyright  2013 onwards Andrew Davis
+# license    http://www.gnu.org/copyleft/gpl.html GNU GPL v3 or later
+
+# Fixed point physics against float physics, run from the top of the repository:
+#
+#   python -m unittest discover tests
+
+import os, unittest
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+from colorcube.world import *
+from keys import random_keys, press
+
+def play(level, seed, fixed_point):
+    # positions every tick with random keys
+    world = World(fixed_point=fixed_point)
+    world.setup_level(level)
+    trace = []
+    for key in random_keys(seed):
+        press(world, key)
+        world.step()
+        trace.append([tuple(world.player_block.pos)] + [tuple(cube.pos) for cube in world.cubes])
+        if world.reached_exit:
+            break
+    return trace
+
+class FixedPointTest(unittest.TestCase):
+    
+    def test_no_jump_at_the_top_of_a_jump(self):
+        for fixed_point in (False, True):
+            world = World(fixed_point=fixed_point)
+            world.setup_level(1)
+            world.key_down(K_SPACE)
+            for i in range(35):
+                world.step()
+            world.key_up(K_SPACE)
+            world.key_down(K_SPACE)
+            self.assertTrue(world.player_block.vel[1] > 0)
+    
+    def test_within_a_pixel_of_float(self):
+        for level in range(1, 9):
+            for seed in range(6):
+                floats = play(level, seed, False)
+                fixed = play(level, seed, True)
+                self.assertEqual(len(floats), len(fixed), 'level %d seed %d' % (level, seed))
+                for t, (a, b) in enumerate(zip(floats, fixed)):
+                    for (p, q) in zip(a, b):
+                        if abs(p[0] - q[0]) > 1 or abs(p[1] - q[1]) > 1:
+                            self.fail('level %d seed %d tick %d: %r and %r' % (level, seed, t, a, b))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+# This is a game called "Color Cube".
+#
+# Color Cube is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Color Cube is distributed in the hope that it will be useful and maybe even fun,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Color Cube.  If not, see <http://www.gnu.org/licenses/>.
+#
+# copyright  2013 onwards Andrew Davis
+# license    http://www.gnu.org/copyleft/gpl.html GNU GPL v3 or later
+
+# Repainting only what changed against repainting everything, run from the
+# top of the repository:
+#
+#   python -m unittest discover tests
+
+import os, unittest
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import pygame
+
+from colorcube.world import *
+from colorcube.render import DirtyRenderer, draw_world
+from keys import random_keys, press
+
+class RenderTest(unittest.TestCase):
+    
+    def test_dirty_same_as_full(self):
+        size = (g.width, g.height)
+        bg = pygame.Surface(size)
+        bg.fill((0, 0, 0))
+        full = pygame.Surface(size)
+        dirty = pygame.Surface(size)
+        renderer = DirtyRenderer(dirty)
+        world = World()
+        for level in range(1, 9):
+            world.setup_level(level)
+            renderer.invalidate()
+            for t, key in enumerate(random_keys(level, 150)):
+                press(world, key)
+                world.step()
+                if world.reached_exit:
+                    break
+                # in between ticks too, as when drawing faster than the world steps
+                alpha = (t % 3) / 2.0
+                draw_world(full, bg, world, alpha)
+                renderer.draw(world, (), alpha)
+                self.assertEqual(pygame.image.tostring(full, 'RGB'), pygame.image.tostring(dirty, 'RGB'),
+                    'level %d tick %d' % (level, t))
+
+if __name__ == '__main__':
+    unittest.main()
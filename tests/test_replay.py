@@ -0,0 +1,120 @@
+# This is a game called "Color Cube".
+#
+# Color Cube is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Color Cube is distributed in the hope that it will be useful and maybe even fun,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Color Cube.  If not, see <http://www.gnu.org/licenses/>.
+#
+# copyright  2013 onwards Andrew Davis
+# license    http://www.gnu.org/copyleft/gpl.html GNU GPL v3 or later
+
+# Recording a game and replaying it, run from the top of the repository:
+#
+#   python -m unittest discover tests
+
+import os, shutil, tempfile, unittest
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+from colorcube.replay import *
+from colorcube.batch import BatchWorld
+from colorcube.solver import search
+from keys import random_keys
+
+def game_keys():
+    # The keys for each tick: the solver's way through level 1, then random
+    # keys on level 2 with a restart partway through.
+    world = World()
+    world.setup_level(1)
+    result = search(BatchWorld([world]), 60, 8)
+    ticks = []
+    held = None
+    for (dx, jump) in result.actions:
+        keys = []
+        k = {-1: K_LEFT, 0: None, 1: K_RIGHT}[dx]
+        if k != held:
+            if held:
+                keys.append((held, False))
+            if k:
+                keys.append((k, True))
+            held = k
+        if jump:
+            keys += [(K_SPACE, True), (K_SPACE, False)]
+        ticks += [keys] + [[]] * 7
+    ticks = ticks[:result.ticks]
+    if held:
+        ticks.append([(held, False)])
+    for key in random_keys(1, 600):
+        ticks.append(key and [key] or [])
+    ticks[len(ticks) - 300].append((K_r, True))
+    return ticks
+
+def record(path, ticks, dt):
+    # Play ticks the way the game does, recording them. Returns the World
+    # and the levels completed.
+    world = World(dt=dt)
+    world.setup_level(1)
+    recorder = Recorder(path, 1, dt=dt)
+    completed = 0
+    for keys in ticks:
+        for (k, down) in keys:
+            recorder.key(k, down)
+            if k == K_r:
+                world.restart()
+            elif down:
+                world.key_down(k)
+            else:
+                world.key_up(k)
+        world.step()
+        recorder.stepped(world)
+        if world.reached_exit:
+            completed += 1
+            world.setup_level(world.level + 1)
+    recorder.close()
+    return world, completed
+
+class ReplayTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+    
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+    
+    def test_replays_to_the_same_state(self):
+        ticks = game_keys()
+        for dt in (1, 2):
+            path = os.path.join(self.dir, 'game%d.ccr' % dt)
+            world, completed = record(path, ticks, dt)
+            if dt == 1:
+                self.assertEqual(completed, 1)
+            replay = Replay(path)
+            replayed = replay.run()
+            self.assertEqual(replay.ticks, len(ticks))
+            self.assertEqual(replay.hashes_checked, len(ticks) // 60)
+            self.assertEqual(replay.levels_completed, completed)
+            self.assertEqual(replayed.level, world.level)
+            self.assertEqual(replayed.state_hash(), world.state_hash())
+    
+    def test_changed_physics_found(self):
+        path = os.path.join(self.dir, 'game.ccr')
+        record(path, game_keys(), 1)
+        level, hash_every, dt, records = read_recording(path)
+        i = max(i for i, (tick, kind, value) in enumerate(records) if kind == RECORD_HASH)
+        (tick, kind, value) = records[i]
+        records[i] = (tick, kind, value ^ 1)
+        replay = Replay(path)
+        replay.records = records
+        self.assertRaises(ReplayError, replay.run)
+
+if __name__ == '__main__':
+    unittest.main()
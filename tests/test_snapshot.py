@@ -0,0 +1,74 @@
+# This is a game called "Color Cube".
+#
+# Color Cube is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Color Cube is distributed in the hope that it will be useful and maybe even fun,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Color Cube.  If not, see <http://www.gnu.org/licenses/>.
+#
+# copyright  2013 onwards Andrew Davis
+# license    http://www.gnu.org/copyleft/gpl.html GNU GPL v3 or later
+
+# Snapshots and restarts, run from the top of the repository:
+#
+#   python -m unittest discover tests
+
+import os, unittest
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+from colorcube.world import *
+from keys import random_keys, press
+
+def hashes(world, keys):
+    trace = []
+    for key in keys:
+        press(world, key)
+        world.step()
+        trace.append(world.state_hash())
+        if world.reached_exit:
+            break
+    return trace
+
+class SnapshotTest(unittest.TestCase):
+    
+    def test_restore_plays_the_same(self):
+        for level in range(1, 9):
+            world = World()
+            world.setup_level(level)
+            hashes(world, random_keys(level, 400))
+            snapshot = world.snapshot()
+            start = world.state_hash()
+            after = hashes(world, random_keys(99, 1500))
+            
+            world.restore(snapshot)
+            self.assertEqual(world.state_hash(), start)
+            self.assertEqual(hashes(world, random_keys(99, 1500)), after, 'level %d' % level)
+            
+            # into another World, which has to set the level up first
+            other = World()
+            other.restore(snapshot)
+            self.assertEqual(other.state_hash(), start)
+            self.assertEqual(hashes(other, random_keys(99, 1500)), after, 'level %d' % level)
+    
+    def test_restart_is_a_new_level(self):
+        for level in range(1, 9):
+            world = World()
+            world.setup_level(level)
+            hashes(world, random_keys(level, 300))
+            world.restart()
+            new = World()
+            new.setup_level(level)
+            self.assertEqual(world.state_hash(), new.state_hash())
+            self.assertEqual(hashes(world, random_keys(5, 1000)), hashes(new, random_keys(5, 1000)))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+# This is a game called "Color Cube".
+#
+# Color Cube is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Color Cube is distributed in the hope that it will be useful and maybe even fun,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Color Cube.  If not, see <http://www.gnu.org/licenses/>.
+#
+# copyright  2013 onwards Andrew Davis
+# license    http://www.gnu.org/copyleft/gpl.html GNU GPL v3 or later
+
+# Swept collisions against the checks at the end of each tick, run from the
+# top of the repository:
+#
+#   python -m unittest discover tests
+
+import os, unittest
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+from colorcube.world import *
+from keys import random_keys, press
+
+def hashes(level, seed, swept):
+    world = World(swept=swept)
+    world.setup_level(level)
+    trace = []
+    for key in random_keys(seed):
+        press(world, key)
+        world.step()
+        trace.append(world.state_hash())
+        if world.reached_exit:
+            break
+    return trace
+
+class SweptTest(unittest.TestCase):
+    
+    def test_same_at_one_tick_a_step(self):
+        # these once absorbed cubes the player only clipped partway through a tick
+        runs = [(2, 9), (6, 10), (7, 5), (7, 10)]
+        runs += [(level, 0) for level in range(1, 9)]
+        for (level, seed) in runs:
+            self.assertEqual(hashes(level, seed, False), hashes(level, seed, True), 'level %d seed %d' % (level, seed))
+
+if __name__ == '__main__':
+    unittest.main()